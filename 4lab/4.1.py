@@ -1,57 +1,37 @@
-import pandas as pd
+from power_parallel import run_power_queries_parallel
 
 file_path = '/home/liza/lab2/ad/4lab/VHI/household_power_consumption.txt'
 
-# Load data into a pandas DataFrame
-data_df = pd.read_csv(file_path, delimiter=';', parse_dates=[['Date', 'Time']], dayfirst=True, dtype={'Global_active_power': 'float64', 'Global_reactive_power': 'float64', 'Voltage': 'float64', 'Global_intensity': 'float64', 'Sub_metering_1': 'float64', 'Sub_metering_2': 'float64', 'Sub_metering_3': 'float64'}, na_values='?')
-
-# 1. Відібрати домогосподарства, де загальне споживання електроенергії перевищує 5 кВт.
-domestic_consumers = data_df[
-    (data_df['Sub_metering_1'] + data_df['Sub_metering_2'] + data_df['Sub_metering_3']) > 5
-]
-
-# 2. Обрати всі домогосподарства, у яких вольтаж перевищую 235 В.
-domestic_consumers_voltage = data_df[data_df['Voltage'] > 235] 
-
-# 3. Виберіть домогосподарства, де струм становить від 19 до 20 А, і де пральна машина і холодильник споживають більше, ніж котел і кондиціонер.
-domestic_consumers_current = data_df[
-    (data_df['Global_intensity'] >= 19) &
-    (data_df['Global_intensity'] <= 20) &
-    (data_df['Sub_metering_1'] > data_df['Sub_metering_2']) &
-    (data_df['Sub_metering_2'] > data_df['Sub_metering_3'])
-]
-
-# 4. Випадковим чином відберіть 500000 домогосподарств і обчисліть середнє споживання для кожної субгрупи обліку.
-random_sample = data_df.sample(n=min(500000, len(data_df)))
-
-average_sub_metering_1 = random_sample['Sub_metering_1'].mean()
-average_sub_metering_2 = random_sample['Sub_metering_2'].mean()
-average_sub_metering_3 = random_sample['Sub_metering_3'].mean()
-
-# 5 Відібрати домогосподарства, які споживають більше 6 кВт на хвилину в середньому після 18:00, і серед них ті, у яких основне споживання електроенергії в цей період припадає на пральну машину, сушарку, холодильник та освітлення (група 2 є найбільшою)
-above_six_kw = data_df[
-    (data_df['Date_Time'].dt.hour >= 18) &
-    ((data_df['Sub_metering_1'] + data_df['Sub_metering_2'] + data_df['Sub_metering_3']) > 6)
-]
-
-# 6. Виберіть кожен третій результат з першої половини і кожен четвертий результат з другої половини.
-first_half = above_six_kw.iloc[:len(above_six_kw)//2:3]
-second_half = above_six_kw.iloc[len(above_six_kw)//2::4]
-
-print("Households with electricity consumption exceeding 5 kW:")
-print(domestic_consumers)
-print("\nHouseholds with voltage exceeding 235 V:")
-print(domestic_consumers_voltage)  
-print("\nHouseholds with current between 19-20 A, where washing machine and refrigerator consume more than boiler and air conditioner:")
-print(domestic_consumers_current)
-
-print("\nAverage electricity consumption for Sub_metering_1:", average_sub_metering_1)
-print("Average electricity consumption for Sub_metering_2:", average_sub_metering_2)
-print("Average electricity consumption for Sub_metering_3:", average_sub_metering_3)
-print("\nHouseholds consuming more than 6 kW per minute on average after 18:00:")
-print(above_six_kw)
-
-print("\nEvery third result from the first half:")
-print(first_half)
-print("\nEvery fourth result from the second half:")
-print(second_half)
+if __name__ == '__main__':
+    # Розділи спільного memory-mapped кешу скануються паралельно в кількох процесах, результати зливаються в порядку рядків
+    results = run_power_queries_parallel(file_path)
+
+    domestic_consumers = results['domestic_consumers']
+    domestic_consumers_voltage = results['domestic_consumers_voltage']
+    domestic_consumers_current = results['domestic_consumers_current']
+
+    average_sub_metering_1 = results['average_sub_metering']['Sub_metering_1']
+    average_sub_metering_2 = results['average_sub_metering']['Sub_metering_2']
+    average_sub_metering_3 = results['average_sub_metering']['Sub_metering_3']
+
+    above_six_kw = results['above_six_kw']
+    first_half = results['first_half']
+    second_half = results['second_half']
+
+    print("Households with electricity consumption exceeding 5 kW:")
+    print(domestic_consumers)
+    print("\nHouseholds with voltage exceeding 235 V:")
+    print(domestic_consumers_voltage)  
+    print("\nHouseholds with current between 19-20 A, where washing machine and refrigerator consume more than boiler and air conditioner:")
+    print(domestic_consumers_current)
+
+    print("\nAverage electricity consumption for Sub_metering_1:", average_sub_metering_1)
+    print("Average electricity consumption for Sub_metering_2:", average_sub_metering_2)
+    print("Average electricity consumption for Sub_metering_3:", average_sub_metering_3)
+    print("\nHouseholds consuming more than 6 kW per minute on average after 18:00:")
+    print(above_six_kw)
+
+    print("\nEvery third result from the first half:")
+    print(first_half)
+    print("\nEvery fourth result from the second half:")
+    print(second_half)
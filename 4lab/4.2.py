@@ -1,21 +1,27 @@
+import os
+
 import pandas as pd
-import seaborn as sns
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import OneHotEncoder
-from scipy.stats import pearsonr, spearmanr
+
+from adult_data import load_adult
+from adult_features import AdultFeatures
+from correlation import Correlations, pair_density
 
 # Шлях до файлу даних
 file_path = './adult/adult.data'
+test_path = './adult/adult.test'
+features_path = './adult/adult_features.json'
 
-# Завантаження даних у DataFrame
-data_df = pd.read_csv(file_path, delimiter=', ',  dayfirst=True, na_values='?')
+# Завантаження даних у DataFrame: цілі колонки стиснуті до int8/int16/int32, текстові - category
+data_df = load_adult(file_path)
 
 print(data_df)
 def normalize(data):
-    if data.dtype == 'object':
+    if not pd.api.types.is_numeric_dtype(data):
         print("Column contains non-numeric values and cannot be normalized.")
         return data
     else:
+        data = data.astype('float64')
         normalized_data = (data - data.min()) / (data.max() - data.min())
         return normalized_data
 
@@ -49,17 +55,31 @@ plt.grid(True)
 plt.show()
 
 # Обчислення коефіцієнтів кореляції
-pearson_corr, _ = pearsonr(data_df[attribute1], data_df[attribute2])
-spearman_corr, _ = spearmanr(data_df[attribute1], data_df[attribute2])
+# Повні матриці Пірсона і Спірмена для всіх числових колонок, ранги кожної колонки рахуються один раз
+correlations = Correlations(data_df)
+print("Pearson correlation matrix:\n{}".format(correlations.pearson().round(2)))
+print("Spearman correlation matrix:\n{}".format(correlations.spearman().round(2)))
+pearson_corr = correlations.pair(attribute1, attribute2, 'pearson')
+spearman_corr = correlations.pair(attribute1, attribute2, 'spearman')
 print("Pearson correlation coefficient between {} and {}: {:.2f}".format(attribute1, attribute2, pearson_corr))
 print("Spearman correlation coefficient between {} and {}: {:.2f}".format(attribute1, attribute2, spearman_corr))
 
-# One Hot Encoding
+# One Hot Encoding і масштабування всіх колонок: статистики й словники категорій рахуються за один прохід
+# по adult.data і зберігаються, тож нові записи кодуються без повторного навчання
+if os.path.exists(features_path):
+    features = AdultFeatures.load(features_path)
+else:
+    features = AdultFeatures().fit_file(file_path)
+    features.save(features_path)
+train_features = features.transform_file(file_path)
+test_features = features.transform_file(test_path)
+print("Feature matrix for {}: {} ({} non-zero)".format(file_path, train_features.shape, train_features.nnz))
+print("Feature matrix for {}: {} ({} non-zero)".format(test_path, test_features.shape, test_features.nnz))
+
 categorical_attribute = 'workclass'
-one_hot_encoder = OneHotEncoder()
-one_hot_encoded = one_hot_encoder.fit_transform(data_df[[categorical_attribute]])
-print("One Hot Encoded {}: \n{}".format(categorical_attribute, one_hot_encoded))
+columns = [i for i, name in enumerate(features.feature_names()) if name.startswith(categorical_attribute + '=')]
+print("One Hot Encoded {}: \n{}".format(categorical_attribute, train_features[:, columns]))
 
 # Візуалізація попарних зв'язків між числовими атрибутами
-sns.pairplot(data_df)
+pair_density(data_df)
 plt.show()
@@ -0,0 +1,42 @@
+import pandas as pd
+
+COLUMNS = ['age', 'workclass', 'fnlwgt', 'education', 'education-num', 'marital-status', 'occupation',
+           'relationship', 'race', 'sex', 'capital-gain', 'capital-loss', 'hours-per-week', 'native-country',
+           'income']
+NUMERIC = {'age': 'int8', 'fnlwgt': 'int32', 'education-num': 'int8',
+           'capital-gain': 'int32', 'capital-loss': 'int16', 'hours-per-week': 'int8'}
+CATEGORICAL = ['workclass', 'education', 'marital-status', 'occupation', 'relationship', 'race', 'sex',
+               'native-country']
+
+
+def header_rows(file_path):
+    # adult.data тут має рядок із назвами колонок, adult.test починається з рядка '|1x3 Cross validator'
+    with open(file_path) as f:
+        first = f.readline()
+    return 0 if first[:1].isdigit() else 1
+
+
+def read_options(file_path):
+    # Односимвольний роздільник і skipinitialspace лишають читання на C-парсері замість повільного Python-рушія
+    return dict(sep=',', header=None, names=COLUMNS, skiprows=header_rows(file_path),
+                skipinitialspace=True, na_values='?', engine='c',
+                dtype={**NUMERIC, **{name: 'category' for name in CATEGORICAL}, 'income': str})
+
+
+def clean_labels(df):
+    # В adult.test мітки мають крапку в кінці: '<=50K.' і '>50K.'
+    df['income'] = df['income'].str.rstrip('.').astype('category')
+    return df
+
+
+def read_adult_chunks(file_path, chunksize=100000):
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, **read_options(file_path)):
+        yield clean_labels(chunk)
+
+
+def load_adult(file_path, like=None):
+    df = clean_labels(pd.read_csv(file_path, **read_options(file_path)))
+    if like is not None:
+        # Однакові набори категорій для навчальної і тестової вибірок, щоб кодування колонок збігалося
+        df = df.astype({name: like[name].dtype for name in CATEGORICAL + ['income']})
+    return df
@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from adult_data import CATEGORICAL, NUMERIC, read_adult_chunks
+
+
+class AdultFeatures:
+    # Числові колонки масштабуються ('standard' або 'minmax'), категоріальні кодуються one-hot;
+    # пропуски '?' дають нульовий рядок у блоці своєї колонки
+    def __init__(self, numeric=list(NUMERIC), categorical=CATEGORICAL, scaling='standard'):
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.scaling = scaling
+        self.stats = {name: {'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': np.inf, 'max': -np.inf}
+                      for name in self.numeric}
+        self.vocab = {name: [] for name in self.categorical}
+
+    def partial_fit(self, chunk):
+        for name in self.numeric:
+            values = chunk[name].dropna().to_numpy(dtype=np.float64)
+            if not len(values):
+                continue
+            stats = self.stats[name]
+            # Злиття середнього і суми квадратів відхилень двох частин (формула Чана)
+            count, mean = len(values), values.mean()
+            total = stats['count'] + count
+            delta = mean - stats['mean']
+            stats['m2'] += ((values - mean) ** 2).sum() + delta ** 2 * stats['count'] * count / total
+            stats['mean'] += delta * count / total
+            stats['count'] = total
+            stats['min'] = min(stats['min'], float(values.min()))
+            stats['max'] = max(stats['max'], float(values.max()))
+        for name in self.categorical:
+            self.vocab[name] = sorted(set(self.vocab[name]) | set(chunk[name].dropna().unique()))
+        return self
+
+    def fit(self, chunks):
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def fit_file(self, file_path, chunksize=100000):
+        return self.fit(read_adult_chunks(file_path, chunksize))
+
+    def feature_names(self):
+        return self.numeric + [f'{name}={value}' for name in self.categorical for value in self.vocab[name]]
+
+    def scale(self, name, values):
+        stats = self.stats[name]
+        if self.scaling == 'minmax':
+            span = stats['max'] - stats['min']
+            return (values - stats['min']) / (span if span else 1.0)
+        std = np.sqrt(stats['m2'] / (stats['count'] - 1)) if stats['count'] > 1 else 0.0
+        return (values - stats['mean']) / (std if std else 1.0)
+
+    def transform(self, chunk):
+        rows = np.arange(len(chunk))
+        row_parts, col_parts, value_parts = [], [], []
+        for column, name in enumerate(self.numeric):
+            values = self.scale(name, chunk[name].to_numpy(dtype=np.float64))
+            present = ~np.isnan(values)
+            row_parts.append(rows[present])
+            col_parts.append(np.full(present.sum(), column))
+            value_parts.append(values[present])
+
+        offset = len(self.numeric)
+        for name in self.categorical:
+            # Невідомі категорії та пропуски отримують код -1 і не потрапляють у матрицю
+            codes = pd.Categorical(chunk[name], categories=self.vocab[name]).codes
+            known = codes >= 0
+            row_parts.append(rows[known])
+            col_parts.append(offset + codes[known])
+            value_parts.append(np.ones(known.sum()))
+            offset += len(self.vocab[name])
+
+        return sp.csr_matrix((np.concatenate(value_parts), (np.concatenate(row_parts), np.concatenate(col_parts))),
+                             shape=(len(chunk), offset), dtype=np.float32)
+
+    def transform_chunks(self, chunks):
+        return sp.vstack([self.transform(chunk) for chunk in chunks], format='csr')
+
+    def transform_file(self, file_path, chunksize=100000):
+        return self.transform_chunks(read_adult_chunks(file_path, chunksize))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'numeric': self.numeric, 'categorical': self.categorical, 'scaling': self.scaling,
+                       'stats': self.stats, 'vocab': self.vocab}, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            state = json.load(f)
+        features = cls(state['numeric'], state['categorical'], state['scaling'])
+        features.stats = state['stats']
+        features.vocab = state['vocab']
+        return features
@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import power_data
+import power_np
+
+HEADER = ('Date;Time;Global_active_power;Global_reactive_power;Voltage;Global_intensity;'
+          'Sub_metering_1;Sub_metering_2;Sub_metering_3\n')
+QUERIES = ['select_consumers', 'select_voltage', 'select_current', 'sample_means', 'select_evening', 'half_split']
+ENGINES = {'pandas': power_data, 'numpy': power_np}
+
+
+def generate_power_file(file_path, rows, seed=0, chunksize=1000000):
+    # Синтетичний файл у форматі household_power_consumption.txt, однаковий для однакових rows і seed
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2006-12-16T17:24', 'm')
+    with open(file_path, 'w') as f:
+        f.write(HEADER)
+        for offset in range(0, rows, chunksize):
+            count = min(chunksize, rows - offset)
+            minutes = pd.DatetimeIndex(start + np.arange(offset, offset + count))
+            active = rng.gamma(2.0, 0.55, count)
+            frame = pd.DataFrame({
+                'Date': minutes.day.astype(str) + '/' + minutes.month.astype(str) + '/' + minutes.year.astype(str),
+                'Time': minutes.strftime('%H:%M:%S'),
+                'Global_active_power': active,
+                'Global_reactive_power': rng.random(count) * 0.5,
+                'Voltage': rng.normal(240.8, 3.2, count),
+                'Global_intensity': active * 4.3,
+                'Sub_metering_1': rng.integers(0, 40, count) * (rng.random(count) < 0.1),
+                'Sub_metering_2': rng.integers(0, 40, count) * (rng.random(count) < 0.3),
+                'Sub_metering_3': rng.integers(0, 20, count),
+            })
+            frame.iloc[rng.random(count) < 0.0125, 2:] = np.nan
+            frame.to_csv(f, sep=';', header=False, index=False, float_format='%.3f', na_rep='?')
+
+
+def load(engine, file_path):
+    if engine == 'pandas':
+        return pd.concat(power_data.read_power_chunks(file_path, cached=False))
+    return power_np.load_power_numpy(file_path)
+
+
+def run_engine(engine, file_path):
+    module = ENGINES[engine]
+    result = {}
+    started = time.perf_counter()
+    data = load(engine, file_path)
+    result['parse'] = time.perf_counter() - started
+
+    evening = None
+    for name in QUERIES:
+        started = time.perf_counter()
+        if name == 'sample_means':
+            module.sample_means(data, seed=0)
+        elif name == 'half_split':
+            module.half_split(evening)
+        else:
+            rows = getattr(module, name)(data)
+            if name == 'select_evening':
+                evening = rows
+        result[name] = time.perf_counter() - started
+
+    result['query'] = sum(result[name] for name in QUERIES)
+    result['total'] = result['parse'] + result['query']
+    result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def run_in_subprocess(engine, file_path):
+    # Окремий процес на кожен запуск, щоб пікова RSS одного рушія не впливала на інший
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', engine, file_path],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def benchmark(rows_list, engines, data_dir, repeat=3):
+    results = {}
+    for rows in rows_list:
+        file_path = os.path.join(data_dir, f'power_{rows}.txt')
+        if not os.path.exists(file_path):
+            print(f'Generating {rows} rows into {file_path}')
+            generate_power_file(file_path, rows)
+        for engine in engines:
+            runs = [run_in_subprocess(engine, file_path) for _ in range(repeat)]
+            results.setdefault(engine, {})[str(rows)] = {name: min(run[name] for run in runs) for name in runs[0]}
+    return results
+
+
+def find_regressions(results, baseline, tolerance=0.25, min_seconds=0.05):
+    regressions = []
+    for engine, by_rows in results.items():
+        for rows, metrics in by_rows.items():
+            expected = baseline.get(engine, {}).get(rows, {})
+            for name, value in metrics.items():
+                if name not in expected:
+                    continue
+                slack = 0 if name == 'peak_rss_mb' else min_seconds
+                if value > expected[name] * (1 + tolerance) + slack:
+                    regressions.append((engine, rows, name, expected[name], value))
+    return regressions
+
+
+def print_results(results):
+    for engine, by_rows in results.items():
+        for rows, metrics in by_rows.items():
+            print(f"{engine:>6} {rows:>9} rows: parse {metrics['parse']:.3f} s, query {metrics['query']:.3f} s, "
+                  f"total {metrics['total']:.3f} s, peak RSS {metrics['peak_rss_mb']:.0f} MB")
+            print('       ' + ', '.join(f'{name} {metrics[name]:.4f} s' for name in QUERIES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pandas and NumPy power consumption queries')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000, 10000000])
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=['pandas', 'numpy'])
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'power_bench'))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default='bench_power_baseline.json')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--worker', nargs=2, metavar=('ENGINE', 'FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_engine(*args.worker)))
+        return 0
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = benchmark(args.rows, args.engines, args.data_dir, args.repeat)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}, run with --save-baseline first')
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = find_regressions(results, json.load(f), args.tolerance)
+    for engine, rows, name, expected, value in regressions:
+        print(f'REGRESSION {engine} {rows} rows {name}: {expected:.3f} -> {value:.3f}')
+    if not regressions:
+        print('No regressions against the baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
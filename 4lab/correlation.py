@@ -0,0 +1,78 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+
+def pearson_matrix(values):
+    # Кореляційна матриця всіх колонок одним матричним добутком центрованих і нормованих значень
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt((centered ** 2).sum(axis=0))
+    norms[norms == 0] = np.nan
+    scaled = centered / norms
+    return np.clip(scaled.T @ scaled, -1, 1)
+
+
+class Correlations:
+    def __init__(self, df, columns=None):
+        if columns is None:
+            columns = [name for name in df.columns if pd.api.types.is_numeric_dtype(df[name])]
+        self.columns = list(columns)
+        # Рядки з пропусками в будь-якій з вибраних колонок відкидаються один раз для всіх пар
+        frame = df[self.columns].dropna()
+        self.values = frame.to_numpy(dtype=np.float64)
+        self.ranks = {}
+        self._pearson = None
+        self._spearman = None
+
+    def rank(self, name):
+        # Ранги колонки рахуються один раз і спільні для всіх пар Спірмена
+        if name not in self.ranks:
+            self.ranks[name] = rankdata(self.values[:, self.columns.index(name)])
+        return self.ranks[name]
+
+    def pearson(self):
+        if self._pearson is None:
+            self._pearson = pd.DataFrame(pearson_matrix(self.values), index=self.columns, columns=self.columns)
+        return self._pearson
+
+    def spearman(self):
+        if self._spearman is None:
+            ranks = np.column_stack([self.rank(name) for name in self.columns])
+            self._spearman = pd.DataFrame(pearson_matrix(ranks), index=self.columns, columns=self.columns)
+        return self._spearman
+
+    def pair(self, first, second, method='pearson'):
+        matrix = self.pearson() if method == 'pearson' else self.spearman()
+        return matrix.loc[first, second]
+
+
+def pair_density(df, columns=None, gridsize=40, max_points=None, seed=None, figsize=None):
+    # Замість n² діаграм розсіювання всіх точок: гексагональна щільність або обмежена випадкова вибірка
+    if columns is None:
+        columns = [name for name in df.columns if pd.api.types.is_numeric_dtype(df[name])]
+    data = df[columns].dropna()
+    if max_points is not None and len(data) > max_points:
+        data = data.sample(n=max_points, random_state=seed)
+
+    size = len(columns)
+    fig, axes = plt.subplots(size, size, figsize=figsize or (2 * size, 2 * size), squeeze=False)
+    for i, row_name in enumerate(columns):
+        for j, column_name in enumerate(columns):
+            ax = axes[i, j]
+            if i == j:
+                ax.hist(data[column_name], bins=gridsize)
+            elif max_points is not None:
+                ax.scatter(data[column_name], data[row_name], s=2, alpha=0.3)
+            else:
+                ax.hexbin(data[column_name], data[row_name], gridsize=gridsize, bins='log', mincnt=1)
+            if i == size - 1:
+                ax.set_xlabel(column_name)
+            else:
+                ax.set_xticklabels([])
+            if j == 0:
+                ax.set_ylabel(row_name)
+            else:
+                ax.set_yticklabels([])
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,162 @@
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ATTRIBUTES = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope',
+              'ca', 'thal']
+PROCESSED = {'cleveland': 'processed.cleveland.data', 'hungarian': 'processed.hungarian.data',
+             'switzerland': 'processed.switzerland.data', 'va': 'processed.va.data'}
+
+
+def load_processed(data_dir, sites=PROCESSED):
+    frames = []
+    for site, file_name in sites.items():
+        df = pd.read_csv(os.path.join(data_dir, file_name), header=None, names=ATTRIBUTES + ['num'],
+                         na_values='?', dtype='float64')
+        df.insert(0, 'site', site)
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    df['site'] = df['site'].astype('category')
+    return df
+
+
+def read_table(file_path):
+    # Рядки формату C4.5 "<test>: <value>, <value>." у файлах каталогу costs
+    rows = {}
+    with open(file_path) as f:
+        for line in f:
+            if ':' not in line:
+                continue
+            name, values = line.split(':', 1)
+            rows[name.strip()] = [value.strip().rstrip('.') for value in values.split(',')]
+    return rows
+
+
+def read_costs(costs_dir, prefix='heart-disease'):
+    path = lambda extension: os.path.join(costs_dir, f'{prefix}.{extension}')
+    cost = read_table(path('cost'))
+    delay = read_table(path('delay'))
+    expense = read_table(path('expense'))
+    group = read_table(path('group'))
+    return pd.DataFrame({
+        'cost': [float(cost[name][0]) for name in cost],
+        'delayed': [delay[name][0] == 'delayed' for name in cost],
+        'full': [float(expense[name][0]) for name in cost],
+        'discount': [float(expense[name][1]) for name in cost],
+        'group': [group[name][0] if name in group else None for name in cost],
+    }, index=list(cost))
+
+
+def subset_costs(mask, costs):
+    # mask - булева матриця наборів × тестів у порядку costs.index.
+    # Тести однієї групи мають спільну частину вартості: повна ціна за перший, знижена за решту
+    mask = np.asarray(mask, dtype=bool)
+    grouped = costs['group'].notna().to_numpy()
+    total = mask @ np.where(grouped, costs['discount'], costs['full'])
+    shared = (costs['full'] - costs['discount']).to_numpy()
+    for group in costs['group'].dropna().unique():
+        members = (costs['group'] == group).to_numpy()
+        total += (mask[:, members] * shared[members]).max(axis=1)
+    return total
+
+
+def subset_cost(subset, costs):
+    return float(subset_costs([costs.index.isin(list(subset))], costs)[0])
+
+
+def pareto_front(results, cost='cost', score='accuracy'):
+    # Найдешевші набори, яких не перевершує жоден дешевший або рівний за ціною набір
+    ordered = results.sort_values([cost, score], ascending=[True, False])
+    best = ordered[score].cummax().shift(fill_value=-np.inf)
+    return ordered[ordered[score] > best]
+
+
+class CostAwareSelection:
+    def __init__(self, df, costs, attributes=ATTRIBUTES, folds=5, ridge=1.0, seed=0, workers=None):
+        self.attributes = list(attributes)
+        self.costs = costs
+        self.ridge = ridge
+        self.workers = workers
+        values = df[self.attributes].to_numpy(dtype=np.float64)
+        target = (df['num'].to_numpy() > 0).astype(np.float64)
+
+        # Для кожного фолду один раз рахуються XᵀX і Xᵀy навчальної частини, тоді будь-який набір ознак
+        # розв'язується на підматриці без повторного проходу по даних
+        assignment = np.random.default_rng(seed).permutation(len(df)) % folds
+        self.folds = []
+        for fold in range(folds):
+            train = assignment != fold
+            mean = np.nanmean(values[train], axis=0)
+            filled = np.where(np.isnan(values), mean, values)
+            std = filled[train].std(axis=0)
+            std[std == 0] = 1.0
+            scaled = (filled - mean) / std
+            offset = target[train].mean()
+            x_train = scaled[train]
+            self.folds.append({
+                'gram': x_train.T @ x_train,
+                'moment': x_train.T @ (target[train] - offset),
+                'offset': offset,
+                'x_test': scaled[~train],
+                'y_test': target[~train],
+            })
+        self.scores = {}
+
+    def fold_accuracy(self, fold, subsets):
+        # Гребенева регресія на мітках 0/1 для всіх наборів однакового розміру одним пакетним розв'язком
+        subsets = np.asarray(subsets)
+        size = subsets.shape[1]
+        gram = fold['gram'][subsets[:, :, None], subsets[:, None, :]] + self.ridge * np.eye(size)
+        weights = np.linalg.solve(gram, fold['moment'][subsets][..., None])[..., 0]
+        predictions = np.einsum('nmk,mk->mn', fold['x_test'][:, subsets], weights) + fold['offset']
+        return ((predictions > 0.5) == fold['y_test']).mean(axis=1)
+
+    def evaluate(self, subsets):
+        # Уже оцінені набори беруться з кешу, решта рахуються пакетами за розміром з фолдами в потоках
+        subsets = [tuple(sorted(subset)) for subset in subsets]
+        by_size = {}
+        for subset in set(subsets) - set(self.scores):
+            by_size.setdefault(len(subset), []).append(subset)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for batch in by_size.values():
+                accuracy = np.mean(list(pool.map(lambda fold: self.fold_accuracy(fold, batch), self.folds)), axis=0)
+                # Округлення прибирає різницю в останніх розрядах між однаково точними наборами
+                accuracy = np.round(accuracy, 12)
+                self.scores.update(zip(batch, accuracy))
+        return [self.scores[subset] for subset in subsets]
+
+    def search(self, max_size=None):
+        indices = range(len(self.attributes))
+        subsets = [subset for size in range(1, (max_size or len(indices)) + 1)
+                   for subset in itertools.combinations(indices, size)]
+        accuracy = self.evaluate(subsets)
+        mask = np.zeros((len(subsets), len(self.attributes)), dtype=bool)
+        for row, subset in enumerate(subsets):
+            mask[row, list(subset)] = True
+        costs = self.costs.loc[self.attributes]
+        return pd.DataFrame({
+            'attributes': [', '.join(self.attributes[i] for i in subset) for subset in subsets],
+            'size': mask.sum(axis=1),
+            'cost': subset_costs(mask, costs),
+            'delayed': mask @ costs['delayed'].to_numpy(dtype=int),
+            'accuracy': accuracy,
+        })
+
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), 'heart+disease')
+    started = time.perf_counter()
+    selection = CostAwareSelection(load_processed(data_dir), read_costs(os.path.join(data_dir, 'costs')))
+    results = selection.search()
+    print(f'Evaluated {len(results)} attribute subsets in {time.perf_counter() - started:.2f} s')
+    with pd.option_context('display.max_colwidth', None, 'display.width', 200):
+        print(pareto_front(results).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ATTRIBUTES = ['id', 'ccf', 'age', 'sex', 'painloc', 'painexer', 'relrest', 'pncaden', 'cp', 'trestbps', 'htn',
+              'chol', 'smoke', 'cigs', 'years', 'fbs', 'dm', 'famhist', 'restecg', 'ekgmo', 'ekgday', 'ekgyr',
+              'dig', 'prop', 'nitr', 'pro', 'diuretic', 'proto', 'thaldur', 'thaltime', 'met', 'thalach',
+              'thalrest', 'tpeakbps', 'tpeakbpd', 'dummy', 'trestbpd', 'exang', 'xhypo', 'oldpeak', 'slope',
+              'rldv5', 'rldv5e', 'ca', 'restckm', 'exerckm', 'restef', 'restwm', 'exeref', 'exerwm', 'thal',
+              'thalsev', 'thalpul', 'earlobe', 'cmo', 'cday', 'cyr', 'num', 'lmt', 'ladprox', 'laddist', 'diag',
+              'cxmain', 'ramus', 'om1', 'om2', 'rcaprox', 'rcadist', 'lvx1', 'lvx2', 'lvx3', 'lvx4', 'lvf',
+              'cathef', 'junk', 'name']
+SITES = {'cleveland': 'cleveland.data', 'hungarian': 'hungarian.data', 'switzerland': 'switzerland.data',
+         'long-beach-va': 'long-beach-va.data'}
+MISSING = -9
+INT_DTYPES = ['Int8', 'Int16', 'Int32', 'Int64']
+
+
+def is_number(token):
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def iter_records(file_path):
+    # Запис розкиданий по кількох рядках і закінчується полем name - єдиним нечисловим токеном
+    # ('name' у файлах сайтів, прізвище пацієнта в new.data)
+    tokens = []
+    with open(file_path, encoding='latin-1') as f:
+        for line in f:
+            for token in line.split():
+                tokens.append(token)
+                if not is_number(token):
+                    yield tokens
+                    tokens = []
+
+
+def column_names(length):
+    # Назви з heart-disease.names описують лише 76-польові записи сайтів. new.data має 89 числових полів
+    # з іншим порядком (наприклад, на місці pncaden там -27), тому його поля названі за номером
+    if length == len(ATTRIBUTES):
+        return list(ATTRIBUTES)
+    return [f'attr{i}' for i in range(1, length)] + ['name']
+
+
+def typed_column(values):
+    present = values[~np.isnan(values)]
+    if len(present) and np.any(present != np.round(present)):
+        return pd.array(values, dtype='Float32')
+    for dtype in INT_DTYPES:
+        info = np.iinfo(dtype.lower())
+        if not len(present) or (present.min() >= info.min and present.max() <= info.max):
+            return pd.array(values, dtype=dtype)
+
+
+def parse_raw(file_path, record_length=None):
+    # Повертає таблицю і кількість відкинутих записів неправильної довжини (пошкоджений cleveland.data)
+    records, skipped = [], 0
+    for tokens in iter_records(file_path):
+        if record_length is None:
+            record_length = len(tokens)
+        if len(tokens) == record_length and all(token.isascii() and token.isprintable() for token in tokens):
+            records.append(tokens)
+        else:
+            skipped += 1
+
+    values = np.array([tokens[:-1] for tokens in records], dtype=np.float64).reshape(len(records), -1)
+    values[values == MISSING] = np.nan
+    names = column_names(record_length or len(ATTRIBUTES))
+    df = pd.DataFrame({name: typed_column(values[:, i]) for i, name in enumerate(names[:-1])})
+    df['name'] = pd.Categorical([tokens[-1] for tokens in records])
+    return df, skipped
+
+
+def load_sites(data_dir, sites=SITES):
+    frames = []
+    for site, file_name in sites.items():
+        df, skipped = parse_raw(os.path.join(data_dir, file_name))
+        if skipped:
+            print(f'{file_name}: skipped {skipped} malformed records')
+        df.insert(0, 'site', site)
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    df['site'] = df['site'].astype('category')
+    return df
+
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), 'heart+disease')
+    started = time.perf_counter()
+    sites = load_sites(data_dir)
+    print(f'All sites: {sites.shape[0]} records, {sites.shape[1]} columns in {time.perf_counter() - started:.3f} s')
+
+    file_path = os.path.join(data_dir, 'new.data')
+    started = time.perf_counter()
+    new, skipped = parse_raw(file_path)
+    print(f'new.data: {new.shape[0]} records, {new.shape[1]} columns, {skipped} skipped '
+          f'in {time.perf_counter() - started:.3f} s, {new.memory_usage(deep=True).sum() / 1e6:.2f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import json
+import os
+
+import numpy as np
+
+from power_np import DTYPE, count_rows, iter_power_blocks
+
+
+def cache_paths(file_path):
+    base = os.path.splitext(file_path)[0]
+    return base + '.npy', base + '.meta.json'
+
+
+def source_stamp(file_path):
+    stat = os.stat(file_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def cache_is_fresh(file_path):
+    data_path, meta_path = cache_paths(file_path)
+    if not os.path.exists(data_path) or not os.path.exists(meta_path):
+        return False
+    with open(meta_path) as f:
+        return json.load(f) == source_stamp(file_path)
+
+
+def build_cache(file_path):
+    data_path, meta_path = cache_paths(file_path)
+    stamp = source_stamp(file_path)
+    tmp_path = data_path[:-len('.npy')] + '.tmp.npy'
+    # Кеш заповнюється на диску блок за блоком, тож його побудова теж не тримає весь файл у пам'яті
+    rows = count_rows(file_path)
+    data = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=DTYPE, shape=(rows,))
+    filled = 0
+    for block in iter_power_blocks(file_path):
+        data[filled:filled + len(block)] = block
+        filled += len(block)
+    data.flush()
+    del data
+    if filled != rows:
+        os.remove(tmp_path)
+        raise ValueError(f'{file_path}: expected {rows} rows, parsed {filled}')
+    os.replace(tmp_path, data_path)
+    with open(meta_path, 'w') as f:
+        json.dump(stamp, f)
+
+
+def load_power_cached(file_path):
+    # Текстовий файл розбирається один раз; кеш перебудовується, коли змінюється mtime або розмір джерела
+    if not cache_is_fresh(file_path):
+        build_cache(file_path)
+    return np.load(cache_paths(file_path)[0], mmap_mode='r')
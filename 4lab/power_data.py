@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from power_cache import load_power_cached
+
+COLUMNS = ['Global_active_power', 'Global_reactive_power', 'Voltage', 'Global_intensity',
+           'Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
+SUB_METERING = ['Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
+
+
+def read_power_chunks(file_path, chunksize=200000, cached=True):
+    if cached:
+        data = load_power_cached(file_path)
+        for start in range(0, len(data), chunksize):
+            part = data[start:start + chunksize]
+            yield pd.DataFrame({'Date_Time': part['timestamp'].astype('datetime64[s]'),
+                                **{name: part[name] for name in COLUMNS}},
+                               index=pd.RangeIndex(start, start + len(part)))
+        return
+
+    dtype = {'Date': str, 'Time': str, **{name: 'float32' for name in COLUMNS}}
+    for chunk in pd.read_csv(file_path, delimiter=';', dtype=dtype, na_values='?', chunksize=chunksize):
+        # Фіксований формат замість вгадування формату для кожного рядка
+        date_time = pd.to_datetime(chunk['Date'] + ' ' + chunk['Time'], format='%d/%m/%Y %H:%M:%S')
+        chunk = chunk.drop(columns=['Date', 'Time'])
+        chunk.insert(0, 'Date_Time', date_time)
+        yield chunk
+
+
+def total_consumption(df):
+    return df['Sub_metering_1'] + df['Sub_metering_2'] + df['Sub_metering_3']
+
+
+# 1. Загальне споживання перевищує 5 кВт
+def select_consumers(df):
+    return df[total_consumption(df) > 5]
+
+
+# 2. Вольтаж перевищує 235 В
+def select_voltage(df):
+    return df[df['Voltage'] > 235]
+
+
+# 3. Струм від 19 до 20 А, пральна машина і холодильник споживають більше, ніж котел і кондиціонер
+def select_current(df):
+    return df[(df['Global_intensity'] >= 19) &
+              (df['Global_intensity'] <= 20) &
+              (df['Sub_metering_1'] > df['Sub_metering_2']) &
+              (df['Sub_metering_2'] > df['Sub_metering_3'])]
+
+
+# 4. Середнє споживання субгруп для випадкової вибірки
+def sample_means(df, sample_size=500000, seed=None):
+    return df[SUB_METERING].sample(n=min(sample_size, len(df)), random_state=seed).mean()
+
+
+# 5. Більше 6 кВт після 18:00
+def select_evening(df):
+    return df[(df['Date_Time'].dt.hour >= 18) & (total_consumption(df) > 6)]
+
+
+# 6. Кожен третій з першої половини і кожен четвертий з другої
+def half_split(rows):
+    return rows.iloc[:len(rows) // 2:3], rows.iloc[len(rows) // 2::4]
+
+
+class PowerQueries:
+    # Часткові результати шести запитів, що накопичуються по чанках
+    def __init__(self, sample_size=500000, seed=None):
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.domestic_consumers = []
+        self.domestic_consumers_voltage = []
+        self.domestic_consumers_current = []
+        self.above_six_kw = []
+        self.sample = None
+        self.sample_keys = np.empty(0)
+
+    def update(self, chunk):
+        self.domestic_consumers.append(select_consumers(chunk))
+        self.domestic_consumers_voltage.append(select_voltage(chunk))
+        self.domestic_consumers_current.append(select_current(chunk))
+
+        # Випадкова вибірка: кожен рядок отримує випадковий ключ, у вибірці лишаються sample_size найменших
+        keys = self.rng.random(len(chunk))
+        sample = chunk[SUB_METERING]
+        if self.sample is not None:
+            sample = pd.concat([self.sample, sample])
+            keys = np.concatenate([self.sample_keys, keys])
+        if len(keys) > self.sample_size:
+            keep = np.sort(np.argpartition(keys, self.sample_size)[:self.sample_size])
+            sample, keys = sample.iloc[keep], keys[keep]
+        self.sample, self.sample_keys = sample, keys
+
+        self.above_six_kw.append(select_evening(chunk))
+
+    def results(self):
+        above_six_kw = pd.concat(self.above_six_kw)
+        first_half, second_half = half_split(above_six_kw)
+        return {
+            'domestic_consumers': pd.concat(self.domestic_consumers),
+            'domestic_consumers_voltage': pd.concat(self.domestic_consumers_voltage),
+            'domestic_consumers_current': pd.concat(self.domestic_consumers_current),
+            'average_sub_metering': self.sample.mean(),
+            'above_six_kw': above_six_kw,
+            'first_half': first_half,
+            'second_half': second_half,
+        }
+
+
+def run_power_queries(file_path, chunksize=200000, sample_size=500000, seed=None, cached=True):
+    queries = PowerQueries(sample_size, seed)
+    for chunk in read_power_chunks(file_path, chunksize, cached):
+        queries.update(chunk)
+    return queries.results()
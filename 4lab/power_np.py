@@ -0,0 +1,137 @@
+import io
+
+import numpy as np
+
+COLUMNS = ['Global_active_power', 'Global_reactive_power', 'Voltage', 'Global_intensity',
+           'Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
+RAW_DTYPE = [('Date', 'S10'), ('Time', 'S8')] + [(name, 'f4') for name in COLUMNS]
+DTYPE = [('timestamp', 'i8'), ('hour', 'i1'), ('minute', 'i1')] + [(name, 'f4') for name in COLUMNS]
+
+
+def _digits(chars, start, count):
+    # Число з count цифр, що починається з позиції start у кожному рядку
+    rows = np.arange(len(chars))[:, None]
+    digits = chars[rows, start[:, None] + np.arange(count)].astype(np.int64) - ord('0')
+    return digits @ (10 ** np.arange(count - 1, -1, -1))
+
+
+def parse_dates(dates):
+    # d/m/yyyy без доповнення нулями, розбір через байтове представлення поля S10
+    chars = np.ascontiguousarray(dates).view(np.uint8).reshape(-1, dates.dtype.itemsize)
+    first_slash, second_slash = np.nonzero(chars == ord('/'))[1].reshape(-1, 2).T
+    zero = np.zeros(len(chars), dtype=np.int64)
+    day = np.where(first_slash == 2, _digits(chars, zero, 2), _digits(chars, zero, 1))
+    month = np.where(second_slash - first_slash == 3, _digits(chars, first_slash + 1, 2),
+                     _digits(chars, first_slash + 1, 1))
+    year = _digits(chars, second_slash + 1, 4)
+    days = ((year - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (month - 1)).astype('datetime64[D]')
+    return (days + (day - 1)).astype(np.int64)
+
+
+def parse_times(times):
+    # hh:mm:ss фіксованої ширини
+    chars = np.ascontiguousarray(times).view(np.uint8).reshape(-1, times.dtype.itemsize).astype(np.int64) - ord('0')
+    return chars[:, 0] * 10 + chars[:, 1], chars[:, 3] * 10 + chars[:, 4], chars[:, 6] * 10 + chars[:, 7]
+
+
+def parse_power_text(text):
+    # '?' і порожнє останнє поле в рядках з пропусками стають nan, тоді np.loadtxt читає все без конвертерів
+    text = text.replace(b'?', b'nan').replace(b';\r\n', b';nan\r\n').replace(b';\n', b';nan\n')
+    if text.endswith(b';'):
+        text += b'nan'
+    raw = np.loadtxt(io.BytesIO(text), delimiter=';', dtype=RAW_DTYPE, ndmin=1)
+
+    hour, minute, second = parse_times(raw['Time'])
+    data = np.empty(len(raw), dtype=DTYPE)
+    data['timestamp'] = parse_dates(raw['Date']) * 86400 + hour * 3600 + minute * 60 + second
+    data['hour'] = hour
+    data['minute'] = minute
+    for name in COLUMNS:
+        data[name] = raw[name]
+    return data
+
+
+def iter_power_blocks(file_path, block_size=1 << 24):
+    # Файл читається блоками по block_size байтів, обрізаними до цілих рядків, тож пам'ять залежить від блоку,
+    # а не від розміру файлу
+    with open(file_path, 'rb') as f:
+        f.readline()
+        rest = b''
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block = rest + block
+            end = block.rfind(b'\n') + 1
+            rest = block[end:]
+            if end:
+                yield parse_power_text(block[:end])
+        if rest.strip():
+            yield parse_power_text(rest)
+
+
+def count_rows(file_path):
+    # Непорожні рядки без заголовка - стільки ж записів повертає iter_power_blocks
+    with open(file_path, 'rb') as f:
+        f.readline()
+        return sum(1 for line in f if line.strip())
+
+
+def load_power_numpy(file_path):
+    blocks = list(iter_power_blocks(file_path))
+    return np.concatenate(blocks) if blocks else np.empty(0, dtype=DTYPE)
+
+
+def total_consumption(data):
+    return data['Sub_metering_1'] + data['Sub_metering_2'] + data['Sub_metering_3']
+
+
+# 1. Загальне споживання перевищує 5 кВт
+def consumers_mask(data):
+    return total_consumption(data) > 5
+
+
+def select_consumers(data):
+    return data[consumers_mask(data)]
+
+
+# 2. Вольтаж перевищує 235 В
+def voltage_mask(data):
+    return data['Voltage'] > 235
+
+
+def select_voltage(data):
+    return data[voltage_mask(data)]
+
+
+# 3. Струм від 19 до 20 А, пральна машина і холодильник споживають більше, ніж котел і кондиціонер
+def current_mask(data):
+    return ((data['Global_intensity'] >= 19) &
+            (data['Global_intensity'] <= 20) &
+            (data['Sub_metering_1'] > data['Sub_metering_2']) &
+            (data['Sub_metering_2'] > data['Sub_metering_3']))
+
+
+def select_current(data):
+    return data[current_mask(data)]
+
+
+# 4. Середнє споживання субгруп для випадкової вибірки
+def sample_means(data, sample_size=500000, seed=None):
+    indices = np.random.default_rng(seed).choice(len(data), size=min(sample_size, len(data)), replace=False)
+    sample = data[indices]
+    return tuple(np.nanmean(sample[name]) for name in ('Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3'))
+
+
+# 5. Більше 6 кВт після 18:00
+def evening_mask(data):
+    return (data['hour'] >= 18) & (total_consumption(data) > 6)
+
+
+def select_evening(data):
+    return data[evening_mask(data)]
+
+
+# 6. Кожен третій з першої половини і кожен четвертий з другої
+def half_split(rows):
+    return rows[:len(rows) // 2:3], rows[len(rows) // 2::4]
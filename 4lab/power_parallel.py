@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import power_data
+import power_np
+from power_cache import cache_paths, load_power_cached
+
+MASKS = {
+    'domestic_consumers': power_np.consumers_mask,
+    'domestic_consumers_voltage': power_np.voltage_mask,
+    'domestic_consumers_current': power_np.current_mask,
+    'above_six_kw': power_np.evening_mask,
+}
+
+# Відкриті memory-mapped масиви кешу, по одному на процес; сторінки файлу спільні між усіма процесами
+_arrays = {}
+
+
+def _open(cache_path):
+    if cache_path not in _arrays:
+        _arrays[cache_path] = np.load(cache_path, mmap_mode='r')
+    return _arrays[cache_path]
+
+
+def _scan(cache_path, name, start, stop):
+    # Глобальні номери рядків розділу [start, stop), що проходять запит name
+    return start + np.flatnonzero(MASKS[name](_open(cache_path)[start:stop]))
+
+
+def _sample_sums(cache_path, indices):
+    rows = _open(cache_path)[indices]
+    return [(np.nansum(rows[name], dtype=np.float64), np.count_nonzero(~np.isnan(rows[name])))
+            for name in power_data.SUB_METERING]
+
+
+def records_to_frame(records, index):
+    return pd.DataFrame({'Date_Time': records['timestamp'].astype('datetime64[s]'),
+                         **{name: records[name] for name in power_data.COLUMNS}},
+                        index=pd.Index(index))
+
+
+def run_power_queries_parallel(file_path, workers=None, partition_rows=500000, threads=False,
+                               sample_size=500000, seed=None):
+    data = load_power_cached(file_path)
+    cache_path = cache_paths(file_path)[0]
+    bounds = [(start, min(start + partition_rows, len(data))) for start in range(0, len(data), partition_rows)]
+    sample = np.sort(np.random.default_rng(seed).choice(len(data), size=min(sample_size, len(data)), replace=False))
+
+    # Усі запити і всі розділи подаються одразу, результати збираються в порядку розділів,
+    # тому порядок рядків такий самий, як у послідовного сканування
+    executor = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    with executor(max_workers=workers) as pool:
+        scans = {name: [pool.submit(_scan, cache_path, name, start, stop) for start, stop in bounds]
+                 for name in MASKS}
+        sample_parts = [pool.submit(_sample_sums, cache_path, part)
+                        for part in np.array_split(sample, max(len(bounds), 1))]
+        indices = {name: np.concatenate([future.result() for future in futures] or [np.empty(0, dtype=np.int64)])
+                   for name, futures in scans.items()}
+        sums = np.sum([future.result() for future in sample_parts], axis=0)
+
+    results = {name: records_to_frame(data[index], index) for name, index in indices.items()}
+    results['average_sub_metering'] = pd.Series(sums[:, 0] / sums[:, 1], index=power_data.SUB_METERING)
+    # Запит 6 ділить навпіл уже об'єднаний результат запиту 5
+    results['first_half'], results['second_half'] = power_data.half_split(results['above_six_kw'])
+    return results
@@ -0,0 +1,118 @@
+import json
+import os
+
+import numpy as np
+
+from power_cache import load_power_cached, source_stamp
+
+COLUMNS = ['Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3', 'Voltage', 'Global_intensity', 'total']
+STATS = ['sum', 'mean', 'min', 'max', 'count']
+LEVELS = {'hourly': 3600, 'daily': 86400}
+
+
+def rollup_dtype():
+    return ([('bucket', 'i8'), ('hour', 'i1'), ('row_start', 'i8'), ('row_count', 'i4')] +
+            [(f'{name}_{stat}', 'i4' if stat == 'count' else 'f8') for name in COLUMNS for stat in STATS])
+
+
+def build_rollup(data, seconds):
+    timestamps = np.asarray(data['timestamp'])
+    if np.any(timestamps[1:] < timestamps[:-1]):
+        raise ValueError('Rows must be sorted by timestamp')
+    buckets = timestamps // seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]]) if len(buckets) else np.empty(0, dtype=np.int64)
+
+    rollup = np.empty(len(starts), dtype=rollup_dtype())
+    rollup['bucket'] = buckets[starts] * seconds
+    rollup['hour'] = rollup['bucket'] // 3600 % 24
+    rollup['row_start'] = starts
+    rollup['row_count'] = np.diff(np.r_[starts, len(buckets)])
+
+    for name in COLUMNS:
+        if name == 'total':
+            values = np.asarray(data['Sub_metering_1'] + data['Sub_metering_2'] + data['Sub_metering_3'], dtype=np.float64)
+        else:
+            values = np.asarray(data[name], dtype=np.float64)
+        missing = np.isnan(values)
+        count = np.add.reduceat(~missing, starts) if len(starts) else np.empty(0)
+        total = np.add.reduceat(np.where(missing, 0, values), starts) if len(starts) else np.empty(0)
+        rollup[f'{name}_count'] = count
+        rollup[f'{name}_sum'] = total
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rollup[f'{name}_mean'] = total / count
+        if len(starts):
+            rollup[f'{name}_min'] = np.minimum.reduceat(np.where(missing, np.inf, values), starts)
+            rollup[f'{name}_max'] = np.maximum.reduceat(np.where(missing, -np.inf, values), starts)
+        rollup[f'{name}_min'][count == 0] = np.nan
+        rollup[f'{name}_max'][count == 0] = np.nan
+    return rollup
+
+
+def combine(rollup, columns=COLUMNS):
+    # Об'єднання кількох бакетів у одну статистику без звернення до сирих рядків
+    result = {}
+    for name in columns:
+        count = int(rollup[f'{name}_count'].sum())
+        total = float(rollup[f'{name}_sum'].sum())
+        result[name] = {
+            'sum': total,
+            'mean': total / count if count else np.nan,
+            'min': float(np.nanmin(rollup[f'{name}_min'])) if count else np.nan,
+            'max': float(np.nanmax(rollup[f'{name}_max'])) if count else np.nan,
+            'count': count,
+        }
+    return result
+
+
+class PowerRollups:
+    def __init__(self, data, hourly, daily):
+        self.data = data
+        self.levels = {'hourly': hourly, 'daily': daily}
+
+    def date_range(self, start, end, level='daily'):
+        # start і end - datetime64 або рядки '2007-01-01', кінець не включно
+        rollup = self.levels[level]
+        start = np.datetime64(start, 's').astype(np.int64)
+        end = np.datetime64(end, 's').astype(np.int64)
+        return rollup[np.searchsorted(rollup['bucket'], start):np.searchsorted(rollup['bucket'], end)]
+
+    def hours_of_day(self, hours, start=None, end=None):
+        hourly = self.levels['hourly']
+        if start is not None or end is not None:
+            hourly = self.date_range(start or '1970-01-01', end or '2262-01-01', 'hourly')
+        return hourly[np.isin(hourly['hour'], hours)]
+
+    def rows(self, rollup):
+        # Сирі рядки хвилинної роздільності тільки для вибраних бакетів
+        if not len(rollup):
+            return self.data[:0]
+        index = np.repeat(rollup['row_start'] - np.cumsum(np.r_[0, rollup['row_count'][:-1]]), rollup['row_count'])
+        return self.data[index + np.arange(len(index))]
+
+    def select_evening(self, threshold=6, from_hour=18):
+        # Запит 5: переглядаються лише години після from_hour, де максимум сумарного споживання вище порогу
+        hourly = self.levels['hourly']
+        candidates = hourly[(hourly['hour'] >= from_hour) & (hourly['total_max'] > threshold)]
+        rows = self.rows(candidates)
+        return rows[(rows['Sub_metering_1'] + rows['Sub_metering_2'] + rows['Sub_metering_3']) > threshold]
+
+
+def rollup_paths(file_path):
+    base = os.path.splitext(file_path)[0]
+    return {level: f'{base}.{level}.npy' for level in LEVELS}, base + '.rollup.meta.json'
+
+
+def load_power_rollups(file_path):
+    data = load_power_cached(file_path)
+    paths, meta_path = rollup_paths(file_path)
+    stamp = source_stamp(file_path)
+    fresh = os.path.exists(meta_path) and all(os.path.exists(path) for path in paths.values())
+    if fresh:
+        with open(meta_path) as f:
+            fresh = json.load(f) == stamp
+    if not fresh:
+        for level, seconds in LEVELS.items():
+            np.save(paths[level], build_rollup(data, seconds))
+        with open(meta_path, 'w') as f:
+            json.dump(stamp, f)
+    return PowerRollups(data, *(np.load(paths[level], mmap_mode='r') for level in LEVELS))
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+WEEKS = 53
+
+
+class VHICube:
+    # Щільний куб VHI (область x рік x тиждень), NaN там, де даних немає
+    def __init__(self, df, province_column='ProvinceId'):
+        provinces = df[province_column].to_numpy(dtype=np.int64)
+        years = df['Year'].to_numpy(dtype=np.int64)
+        weeks = df['Week'].to_numpy(dtype=np.int64)
+        values = df['VHI'].to_numpy(dtype=np.float32)
+
+        self.provinces = np.unique(provinces)
+        self.years = np.arange(years.min(), years.max() + 1)
+        self.cube = np.full((len(self.provinces), len(self.years), WEEKS), np.nan, dtype=np.float32)
+        self.cube[np.searchsorted(self.provinces, provinces), years - self.years[0], weeks - 1] = values
+        self.cube[self.cube == -1] = np.nan
+
+        observed = ~np.isnan(self.cube)
+        self.minimum = np.where(observed, self.cube, np.inf).min(axis=2)
+        self.maximum = np.where(observed, self.cube, -np.inf).max(axis=2)
+        empty = ~observed.any(axis=2)
+        self.minimum[empty] = np.nan
+        self.maximum[empty] = np.nan
+
+    def _province_index(self, provinces):
+        index = np.searchsorted(self.provinces, provinces)
+        index = np.clip(index, 0, len(self.provinces) - 1)
+        if not np.all(self.provinces[index] == provinces):
+            raise KeyError(f'Unknown ProvinceId in {provinces}')
+        return index
+
+    def _year_index(self, years):
+        years = np.asarray(years)
+        if np.any((years < self.years[0]) | (years > self.years[-1])):
+            raise KeyError(f'Year out of range {self.years[0]}-{self.years[-1]}: {years}')
+        return years - self.years[0]
+
+    def _table(self, values, provinces, years):
+        if provinces is None:
+            provinces = self.provinces
+        if years is None:
+            years = self.years
+        if np.ndim(provinces) == 0 and np.ndim(years) == 0:
+            return values[self._province_index(provinces), self._year_index(years)]
+        provinces, years = np.atleast_1d(provinces), np.atleast_1d(years)
+        table = values[np.ix_(self._province_index(provinces), self._year_index(years))]
+        return pd.DataFrame(table, index=pd.Index(provinces, name='ProvinceId'), columns=pd.Index(years, name='Year'))
+
+    def series(self, province, year):
+        week_values = self.cube[self._province_index(province), self._year_index(year)]
+        weeks = np.flatnonzero(~np.isnan(week_values))
+        return pd.Series(week_values[weeks], index=pd.Index(weeks + 1, name='Week'), name='VHI')
+
+    def vhi_min(self, provinces=None, years=None):
+        return self._table(self.minimum, provinces, years)
+
+    def vhi_max(self, provinces=None, years=None):
+        return self._table(self.maximum, provinces, years)
+
+    def vhi_range(self, year_min, year_max, provinces):
+        province_index = self._province_index(np.asarray(provinces))
+        year_index = self._year_index(np.arange(year_min, year_max + 1))
+        block = self.cube[np.ix_(province_index, year_index)]
+        p, y, w = np.nonzero(~np.isnan(block))
+        return pd.DataFrame({
+            'Year': self.years[year_index][y],
+            'Week': w + 1,
+            'VHI': block[p, y, w],
+            'ProvinceId': self.provinces[province_index][p],
+        })
+
+    def threshold_counts(self, low=-np.inf, high=np.inf):
+        # Кількість областей за кожен рік, у яких хоча б один тиждень має VHI у [low, high]
+        hit = ((self.cube >= low) & (self.cube <= high)).any(axis=2)
+        return pd.Series(hit.sum(axis=0), index=pd.Index(self.years, name='Year'), name='ProvinceId')
+
+    def droughts(self, percent, low=-np.inf, high=np.inf, province_count=None):
+        if province_count is None:
+            province_count = len(self.provinces)
+        counts = self.threshold_counts(low, high)
+        return counts[counts > province_count * percent / 100].reset_index()
+
+    def extreme_droughts(self, percent, province_count=25):
+        return self.droughts(percent, high=15, province_count=province_count)
+
+    def moderate_droughts(self, percent, low=15, high=40):
+        return self.droughts(percent, low, high)
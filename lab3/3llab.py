@@ -1,50 +1,28 @@
 from spyre import server
-import pandas as pd
-import urllib.request
-import requests
+import cherrypy
 import os
-import datetime
-import seaborn as sb
-import matplotlib.pyplot as plt
-
-
-def download_files(dest_dir):
-    df_all = pd.DataFrame()
-    for ids in range(1, 28):
-        url = f"https://www.star.nesdis.noaa.gov/smcd/emb/vci/VH/get_TS_admin.php?country=UKR&provinceID={ids}&year1=1981&year2=2024&type=Mean"
-        response = requests.get(url)
-        if response.status_code == 200:
-            if not os.path.exists('vhi'):
-                os.mkdir('vhi')
-                print(f'The folder is created')
-            date_now = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            vhi_url = urllib.request.urlopen(url)
-            file_name = os.path.join(dest_dir, f'vhi_id_{ids}_{date_now}.csv')
-            out = open(file_name, 'wb')
-            out.write(vhi_url.read())
-            out.close()
-            print(f"VHI from id {ids} was downloaded at {date_now}")
-            headers = ['Year', 'Week', 'SMN', 'SMT', 'VCI', 'TCI', 'VHI', 'empty']
-            df = pd.read_csv(file_name, header=1, names=headers, skiprows=1)[:-1]
-            df = df.drop(df.loc[df['VHI'] == -1].index)
-            df['area'] = int(file_name.split("_")[2])
-            df = df.drop(columns=['empty'])
-            df_all = pd.concat([df_all, df]).drop_duplicates().reset_index(drop=True)
-        else:
-            print('An error occurred')
-            break
+import sys
+from vhi_download import download_provinces
+from vhi_ingest import ingest_provinces, latest_weeks, remap_provinces
+from vhi_store import load_store, read_csv_export, store_exists, write_store
+from vhi_query import VHIQuery, normalize_params
+from vhi_plot import PNGCache, get_renderer
+from vhi_refresh import refresh_store, save_state
+
+
+def download_files(dest_dir, replacements=None):
+    manifest, failed = download_provinces(dest_dir)
+    if failed:
+        # Without state and store the next start downloads again, and the manifest limits it to the missing ids;
+        # a saved state would make later refreshes skip these provinces for good
+        raise IOError(f'VHI for ids {failed} could not be downloaded, run again to resume')
+    df_all = ingest_provinces(dest_dir, manifest)
+    save_state(dest_dir, latest_weeks(df_all), replacements)
+    df_all = remap_provinces(df_all, replacements)
+    write_store(df_all, os.path.join(dest_dir, 'store'))
     df_all.to_csv(os.path.join(dest_dir, 'df_all.csv'), index=False)
 
 
-def read_csv_data(file_name):
-    headers = ['Year', 'Week', 'SMN', 'SMT', 'VCI', 'TCI', 'VHI', 'area']
-    df_all = pd.read_csv(file_name, header=1, names=headers, delimiter=',')
-    df_all['Year'] = df_all['Year'].astype(int)
-    df_all['Week'] = df_all['Week'].astype(int)
-    df_all['area'] = df_all['area'].astype(int)
-    return df_all
-
-
 class StockExample(server.App):
     title = "NOAA data vizualization"
     inputs = [{
@@ -144,47 +122,48 @@ class StockExample(server.App):
 
     def __init__(self):
         self.data_plot = None
+        self.query = VHIQuery(load_store(STORE_DIR))
+        self.png_cache = PNGCache()
 
     def getData(self, params):
-        selected_noaa = params['noaa']
-        selected_region = int(params['regions'])
-        selected_range = params['range']
-        selected_year_min = selected_year_max = params['year']
-        if '-' in params['year']:
-            selected_year_min, selected_year_max = params['year'].split('-')
-        selected_year_min, selected_year_max = int(selected_year_min), int(selected_year_max)
-
-        df_all = read_csv_data('vhi/df_all.csv')
-        diapason_min, diapason_max = map(int, selected_range.split("-"))
-        df = df_all[(df_all['area'] == selected_region) &
-                    (df_all['Year'] >= selected_year_min) &
-                    (df_all['Year'] <= selected_year_max) &
-                    (df_all['Week'] >= diapason_min) &
-                    (df_all['Week'] <= diapason_max)][[selected_noaa, 'Year', 'Week', 'SMN', 'SMT']]
-        return df
+        return self.query.select(*normalize_params(params))
 
     def getPlot(self, params):
-        selected_noaa = params['noaa']
-        data = self.getData(params)
-        df = data.drop(columns=['Year', 'SMN', 'SMT'], axis=1)
+        return get_renderer().render(self.getData(params), params['noaa'], params['show_num'] == 'yes')
+
+    def getRoot(self):
+        webapp = super().getRoot()
+        webapp.plot = self.plot_png
+        return webapp
+
+    @cherrypy.expose
+    def plot_png(self, **params):
+        key = normalize_params(params) + (params['show_num'],)
+        png = self.png_cache.get(key)
+        if png is None:
+            png = get_renderer().render_png(self.getData(params), params['noaa'], params['show_num'] == 'yes')
+            self.png_cache.put(key, png)
+        cherrypy.response.headers['Content-Type'] = 'image/png'
+        return png
 
-        sb.set_style("darkgrid")
-        plt.figure(figsize=(14, 9))
-        with sb.color_palette("Set2"):
-            fig = sb.lineplot(data=df, x='Week', y=selected_noaa, zorder=1)
+VHI_DIR = 'vhi'
+STORE_DIR = os.path.join(VHI_DIR, 'store')
 
-        plt.scatter(df['Week'], df[selected_noaa], marker='*', s=50, color=sb.color_palette("Set2")[1], zorder=2)
 
-        if params['show_num'] == 'yes':
-            for index, row in df.iterrows():
-                plt.text(row['Week'], row[selected_noaa], str(row[selected_noaa]), ha='right', va='bottom')
-        return fig
+def prepare_store(refresh=False):
+    if not store_exists(STORE_DIR):
+        if os.path.exists(os.path.join(VHI_DIR, 'df_all.csv')):
+            df_all = read_csv_export(os.path.join(VHI_DIR, 'df_all.csv'))
+            write_store(df_all, STORE_DIR)
+            save_state(VHI_DIR, latest_weeks(df_all))
+        else:
+            download_files(VHI_DIR)
+    elif refresh:
+        refresh_store(VHI_DIR, STORE_DIR)
 
-VHI_DIR = 'vhi'
 
 if __name__ == '__main__':
-    if not os.path.exists(os.path.join(VHI_DIR, 'df_all.csv')):
-        download_files(VHI_DIR)
+    prepare_store('--refresh' in sys.argv)
     app = StockExample()
     app.launch(port=2222)
 
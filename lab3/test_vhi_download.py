@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from vhi_download import download_provinces, load_manifest
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Answers like get_TS_admin.php; server.plan maps provinceID to a list of status codes, one per request
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        ids = int(query['provinceID'][0])
+        with self.server.lock:
+            self.server.requests.append((ids, dict(self.headers)))
+            plan = self.server.plan.get(ids, [])
+            status = plan.pop(0) if plan else 200
+        self.send_response(status)
+        self.send_header('ETag', f'"vhi-{ids}"')
+        if status == 200:
+            body = f'year,week,VHI\n2024,1,{ids}\n'.encode()
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DownloadProvincesTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.plan = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}/get_TS_admin.php'
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest_dir = os.path.join(self.tmp.name, 'vhi')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def download(self, province_ids, **kwargs):
+        return download_provinces(self.dest_dir, province_ids, workers=4, retries=2, backoff=0.0,
+                                  base_url=self.base_url, **kwargs)
+
+    def requested(self):
+        return sorted(ids for ids, _ in self.server.requests)
+
+    def test_server_error_is_retried(self):
+        self.server.plan = {2: [503, 503]}
+        manifest, failed = self.download([1, 2])
+        self.assertEqual(failed, [])
+        self.assertEqual(self.requested(), [1, 2, 2, 2])
+        with open(os.path.join(self.dest_dir, manifest['2']['file'])) as f:
+            self.assertEqual(f.read(), 'year,week,VHI\n2024,1,2\n')
+
+    def test_missing_province_does_not_abort_the_others(self):
+        self.server.plan = {2: [404]}
+        manifest, failed = self.download([1, 2, 3])
+        self.assertEqual(failed, [2])
+        self.assertEqual(sorted(manifest), ['1', '3'])
+        # 4xx is not retried
+        self.assertEqual(self.requested(), [1, 2, 3])
+
+    def test_resume_fetches_only_missing_provinces(self):
+        self.server.plan = {3: [404]}
+        self.download([1, 2, 3])
+        self.server.requests.clear()
+        manifest, failed = self.download([1, 2, 3])
+        self.assertEqual(failed, [])
+        self.assertEqual(self.requested(), [3])
+        self.assertEqual(sorted(manifest), ['1', '2', '3'])
+        self.assertEqual(load_manifest(self.dest_dir), manifest)
+
+    def test_refresh_sends_etag_and_keeps_entry_on_304(self):
+        first, _ = self.download([1])
+        self.server.requests.clear()
+        self.server.plan = {1: [304]}
+        manifest, failed = self.download([1], refresh=True)
+        self.assertEqual(failed, [])
+        self.assertEqual(self.server.requests[0][1].get('If-None-Match'), '"vhi-1"')
+        self.assertEqual(manifest['1'], first['1'])
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, first['1']['file'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import datetime
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = 'https://www.star.nesdis.noaa.gov/smcd/emb/vci/VH/get_TS_admin.php'
+PROVINCE_IDS = range(1, 28)
+MANIFEST_NAME = 'manifest.json'
+
+
+def province_url(ids, year1=1981, year2=2024, base_url=BASE_URL):
+    return f"{base_url}?country=UKR&provinceID={ids}&year1={year1}&year2={year2}&type=Mean"
+
+
+def make_session(workers):
+    # One pooled session shared by all workers, so connections to NOAA are reused
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def load_manifest(dest_dir):
+    path = os.path.join(dest_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(dest_dir, manifest):
+    path = os.path.join(dest_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def get_with_retries(session, url, headers=None, retries=3, backoff=1.0, timeout=60):
+    error = None
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            error = e
+        else:
+            if response.status_code in (200, 304):
+                return response
+            error = f'HTTP {response.status_code}'
+            if 400 <= response.status_code < 500 and response.status_code != 429:
+                break
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    raise IOError(f'{url} could not be downloaded: {error}')
+
+
+def download_province(session, ids, dest_dir, entry=None, retries=3, backoff=1.0, timeout=60,
+                      base_url=BASE_URL):
+    url = province_url(ids, base_url=base_url)
+    headers = {}
+    if entry is not None and os.path.exists(os.path.join(dest_dir, entry['file'])):
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    else:
+        entry = None
+
+    response = get_with_retries(session, url, headers, retries, backoff, timeout)
+    if response.status_code == 304 and entry is not None:
+        print(f"VHI from id {ids} is not modified since {entry['downloaded']}")
+        return entry
+
+    date_now = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    file_name = f'vhi_id_{ids}_{date_now}.csv'
+    tmp_path = os.path.join(dest_dir, file_name + '.part')
+    with open(tmp_path, 'wb') as out:
+        out.write(response.content)
+    os.replace(tmp_path, os.path.join(dest_dir, file_name))
+    if entry is not None and entry['file'] != file_name:
+        os.remove(os.path.join(dest_dir, entry['file']))
+    print(f"VHI from id {ids} was downloaded at {date_now}")
+    return {
+        'file': file_name,
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'downloaded': date_now,
+    }
+
+
+def download_tails(since, year2, workers=8, retries=3, backoff=1.0, base_url=BASE_URL):
+    # since: {ids: first year to request}; returns {ids: raw file content}
+    tails, failed = {}, []
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(get_with_retries, session, province_url(ids, year1, year2, base_url),
+                                   None, retries, backoff): ids
+                   for ids, year1 in since.items()}
+        for future in as_completed(futures):
+            ids = futures[future]
+            try:
+                tails[ids] = future.result().content
+            except IOError as e:
+                print(e)
+                failed.append(ids)
+    return tails, sorted(failed)
+
+
+def download_provinces(dest_dir, province_ids=PROVINCE_IDS, workers=8, retries=3, backoff=1.0,
+                       refresh=False, base_url=BASE_URL):
+    if not os.path.exists(dest_dir):
+        os.makedirs(dest_dir)
+        print(f'The folder is created')
+
+    manifest = load_manifest(dest_dir)
+    failed = []
+
+    # Provinces finished by an interrupted run are kept as is, unless a refresh is asked for
+    pending = [ids for ids in province_ids
+               if refresh or str(ids) not in manifest
+               or not os.path.exists(os.path.join(dest_dir, manifest[str(ids)]['file']))]
+
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download_province, session, ids, dest_dir, manifest.get(str(ids)),
+                                   retries, backoff, base_url=base_url): ids
+                   for ids in pending}
+        for future in as_completed(futures):
+            ids = futures[future]
+            try:
+                entry = future.result()
+            except IOError as e:
+                print(e)
+                failed.append(ids)
+                continue
+            manifest[str(ids)] = entry
+            save_manifest(dest_dir, manifest)
+
+    return manifest, sorted(failed)
@@ -0,0 +1,50 @@
+import os
+import time
+
+import pandas as pd
+
+HEADERS = ['Year', 'Week', 'SMN', 'SMT', 'VCI', 'TCI', 'VHI', 'empty']
+INDICES = ['SMN', 'SMT', 'VCI', 'TCI', 'VHI']
+PROVINCE_ID_REPLACEMENTS = {1: 22, 2: 24, 3: 23, 4: 25, 5: 3, 6: 4, 7: 8, 8: 19, 9: 20, 10: 21, 11: 9, 13: 10, 14: 11,
+                            15: 12, 16: 13, 17: 15, 18: 14, 19: 16, 21: 17, 22: 18, 23: 6, 24: 1, 25: 2, 26: 7, 27: 5}
+
+
+def parse_province(file_name, area):
+    df = pd.read_csv(file_name, header=1, names=HEADERS, skiprows=1)[:-1]
+    df = df.drop(columns=['empty'])
+    df = df[df['VHI'] != -1]
+    df = df.astype({'Year': 'int16', 'Week': 'int8', **{name: 'float32' for name in INDICES}})
+    df['area'] = pd.Series(area, index=df.index, dtype='uint8')
+    return df
+
+
+def merge_provinces(frames):
+    # One concat and one drop_duplicates for all provinces instead of one per province
+    if not frames:
+        return pd.DataFrame(columns=HEADERS[:-1] + ['area'])
+    return pd.concat(frames, ignore_index=True).drop_duplicates().reset_index(drop=True)
+
+
+def ingest_provinces(dest_dir, manifest):
+    started = time.perf_counter()
+    frames = [parse_province(os.path.join(dest_dir, manifest[ids]['file']), int(ids))
+              for ids in sorted(manifest, key=int)]
+    parsed = time.perf_counter()
+    df_all = merge_provinces(frames)
+    merged = time.perf_counter()
+    print(f'Parsed {len(frames)} provinces in {parsed - started:.3f} s, '
+          f'merged {len(df_all)} rows in {merged - parsed:.3f} s')
+    return df_all
+
+
+def latest_weeks(df):
+    # Last (Year, Week) per area, as {'area': [Year, Week]}
+    key = df['Year'].astype('int32') * 100 + df['Week']
+    last = key.groupby(df['area']).max()
+    return {str(area): [int(value // 100), int(value % 100)] for area, value in last.items()}
+
+
+def remap_provinces(df, replacements):
+    if not replacements:
+        return df
+    return df.assign(area=df['area'].replace(replacements).astype('uint8'))
@@ -0,0 +1,96 @@
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import seaborn as sb
+from matplotlib.figure import Figure
+
+
+class PlotRenderer:
+    # Figure and artists are built once and only their data changes between requests.
+    # The figure is not registered with pyplot, so nothing piles up in a long-running server.
+    def __init__(self, figsize=(14, 9)):
+        palette = sb.color_palette("Set2")
+        with sb.axes_style("darkgrid"):
+            self.figure = Figure(figsize=figsize)
+            self.ax = self.figure.add_subplot()
+        self.line, = self.ax.plot([], [], color=palette[0], zorder=1)
+        self.points = self.ax.scatter([], [], marker='*', s=50, color=palette[1], zorder=2)
+        self.band = None
+        self.labels = []
+        self.ax.set_xlabel('Week')
+
+    def _set_labels(self, x, y, show_numbers):
+        count = len(x) if show_numbers else 0
+        while len(self.labels) < count:
+            self.labels.append(self.ax.text(0, 0, '', ha='right', va='bottom'))
+        for label, week, value in zip(self.labels, x[:count], y[:count]):
+            label.set_position((week, value))
+            label.set_text(str(value))
+            label.set_visible(True)
+        for label in self.labels[count:]:
+            label.set_visible(False)
+
+    def render(self, df, noaa, show_numbers=False):
+        x = df['Week'].to_numpy()
+        y = df[noaa].to_numpy()
+
+        # Mean per week with a 95% band, as sb.lineplot draws for multi-year ranges
+        grouped = df.groupby('Week')[noaa]
+        mean = grouped.mean()
+        self.line.set_data(mean.index.to_numpy(), mean.to_numpy())
+        if self.band is not None:
+            self.band.remove()
+            self.band = None
+        if len(mean) and grouped.size().max() > 1:
+            error = 1.96 * grouped.sem().fillna(0).to_numpy()
+            self.band = self.ax.fill_between(mean.index.to_numpy(), mean.to_numpy() - error,
+                                             mean.to_numpy() + error, color=self.line.get_color(),
+                                             alpha=0.2, linewidth=0, zorder=0)
+
+        self.points.set_offsets(np.column_stack([x, y]))
+        self._set_labels(x, y, show_numbers)
+        self.ax.set_ylabel(noaa)
+
+        self.ax.relim()
+        if len(x):
+            self.ax.update_datalim(np.column_stack([x, y]))
+        self.ax.autoscale_view()
+        return self.figure
+
+    def render_png(self, df, noaa, show_numbers=False):
+        buffer = io.BytesIO()
+        self.render(df, noaa, show_numbers).savefig(buffer, format='png', bbox_inches='tight')
+        return buffer.getvalue()
+
+
+class PNGCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.items:
+                return None
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def put(self, key, png):
+        with self.lock:
+            self.items[key] = png
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+
+_local = threading.local()
+
+
+def get_renderer():
+    # One renderer per server thread: matplotlib artists must not be shared between threads
+    if not hasattr(_local, 'renderer'):
+        _local.renderer = PlotRenderer()
+    return _local.renderer
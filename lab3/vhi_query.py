@@ -0,0 +1,35 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+def normalize_params(params):
+    selected_year_min = selected_year_max = params['year']
+    if '-' in params['year']:
+        selected_year_min, selected_year_max = params['year'].split('-')
+    diapason_min, diapason_max = params['range'].split('-')
+    return (params['noaa'], int(params['regions']), int(selected_year_min), int(selected_year_max),
+            int(diapason_min), int(diapason_max))
+
+
+class VHIQuery:
+    def __init__(self, store, cache_size=256):
+        self.store = store
+        # Rows of an area are sorted by (Year, Week), so one packed key per row is sorted too
+        self.keys = store['Year'].astype(np.int32) * 100 + store['Week']
+        self.cached_select = lru_cache(maxsize=cache_size)(self._select)
+
+    def select(self, noaa, area, year_min, year_max, week_min, week_max):
+        # Every caller gets its own copy, so changing the result in place cannot corrupt the cached frame
+        return self.cached_select(noaa, area, year_min, year_max, week_min, week_max).copy()
+
+    def _select(self, noaa, area, year_min, year_max, week_min, week_max):
+        rows = self.store.area_slice(area)
+        keys = self.keys[rows]
+        start = rows.start + np.searchsorted(keys, year_min * 100 + week_min, side='left')
+        stop = rows.start + np.searchsorted(keys, year_max * 100 + week_max, side='right')
+        df = self.store.to_frame(slice(start, stop), [noaa, 'Year', 'Week', 'SMN', 'SMT'])
+        if year_min != year_max:
+            df = df[(df['Week'] >= week_min) & (df['Week'] <= week_max)]
+        # float32 in the store, shown with the precision of the NOAA files
+        return df.astype({noaa: 'float64', 'SMN': 'float64', 'SMT': 'float64'}).round(3)
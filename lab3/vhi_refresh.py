@@ -0,0 +1,72 @@
+import datetime
+import io
+import json
+import os
+
+from vhi_download import BASE_URL, download_tails
+from vhi_ingest import latest_weeks, merge_provinces, parse_province, remap_provinces
+from vhi_store import load_store, write_store
+
+STATE_NAME = 'ingest_state.json'
+
+
+def load_state(dest_dir):
+    path = os.path.join(dest_dir, STATE_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    state['replacements'] = {int(k): v for k, v in state['replacements'].items()}
+    return state
+
+
+def save_state(dest_dir, last, replacements=None):
+    # last is keyed by NOAA province ID, before the remap, so later refreshes request the right province
+    state = {'last': last, 'replacements': {str(k): v for k, v in (replacements or {}).items()}}
+    path = os.path.join(dest_dir, STATE_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def fetch_new_weeks(dest_dir, workers=8, base_url=BASE_URL):
+    # Weeks past the last ingested (Year, Week) of every province, still keyed by NOAA province ID.
+    # state['last'] is advanced in place; the caller saves it once the new weeks are stored
+    state = load_state(dest_dir)
+    if state is None:
+        raise FileNotFoundError(f'No {STATE_NAME} in {dest_dir}, run a full download first')
+    last = state['last']
+
+    # The last ingested year is requested again, the weeks already ingested are dropped below
+    since = {int(ids): year for ids, (year, week) in last.items()}
+    tails, failed = download_tails(since, datetime.date.today().year, workers, base_url=base_url)
+    if failed:
+        print(f'An error occurred for ids {failed}')
+
+    frames = []
+    for ids, content in tails.items():
+        df = parse_province(io.BytesIO(content), ids)
+        year, week = last[str(ids)]
+        df = df[df['Year'].astype('int32') * 100 + df['Week'] > year * 100 + week]
+        if len(df):
+            frames.append(df)
+    new = merge_provinces(frames)
+    if frames:
+        last.update(latest_weeks(new))
+    return new, state
+
+
+def refresh_store(dest_dir, store_dir, workers=8, base_url=BASE_URL):
+    new, state = fetch_new_weeks(dest_dir, workers, base_url)
+    if new.empty:
+        print('VHI is up to date')
+        return 0
+
+    store = load_store(store_dir)
+    df_all = merge_provinces([store.to_frame(), remap_provinces(new, state['replacements'])])
+    write_store(df_all, store_dir)
+    df_all.to_csv(os.path.join(dest_dir, 'df_all.csv'), index=False)
+    save_state(dest_dir, state['last'], state['replacements'])
+    print(f'{len(new)} new weeks were added for ids {sorted(latest_weeks(new), key=int)}')
+    return len(new)
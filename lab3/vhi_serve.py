@@ -0,0 +1,184 @@
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from multiprocessing import Array
+
+# Every worker renders with its own off-screen Agg figure
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import cherrypy
+from cheroot import wsgi
+
+FIELDS = ['requests', 'errors', 'in_flight', 'busy_seconds', 'started']
+
+
+class WorkerStats:
+    # One row of counters per worker in shared memory created before fork. Every worker updates its row from
+    # several handler threads, so updates and snapshots go through the array's process-shared lock
+    def __init__(self, workers):
+        self.workers = workers
+        self.values = Array('d', workers * len(FIELDS))
+
+    def add(self, slot, field, amount):
+        with self.values.get_lock():
+            self.values[slot * len(FIELDS) + FIELDS.index(field)] += amount
+
+    def set(self, slot, field, value):
+        with self.values.get_lock():
+            self.values[slot * len(FIELDS) + FIELDS.index(field)] = value
+
+    def snapshot(self):
+        with self.values.get_lock():
+            values = self.values[:]
+        rows = [dict(zip(FIELDS, values[slot * len(FIELDS):(slot + 1) * len(FIELDS)]))
+                for slot in range(self.workers)]
+        totals = {field: sum(row[field] for row in rows) for field in ('requests', 'errors', 'in_flight', 'busy_seconds')}
+        return {'workers': rows, 'totals': totals}
+
+
+class MetricsMiddleware:
+    # Answers /healthz and /metrics itself and counts every other request on the way to the spyre app
+    def __init__(self, app, stats, slot):
+        self.app = app
+        self.stats = stats
+        self.slot = slot
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path == '/healthz':
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [f'ok {os.getpid()}\n'.encode()]
+        if path == '/metrics':
+            body = json.dumps(self.stats.snapshot(), indent=2).encode()
+            start_response('200 OK', [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))])
+            return [body]
+
+        status = []
+
+        def capture(code, headers, exc_info=None):
+            status.append(code)
+            return start_response(code, headers, exc_info)
+
+        began = time.perf_counter()
+        self.stats.add(self.slot, 'in_flight', 1)
+        response = None
+        try:
+            response = self.app(environ, capture)
+            body = list(response)
+        except Exception:
+            self.stats.add(self.slot, 'errors', 1)
+            raise
+        finally:
+            # close() is where CherryPy runs its end-of-request hooks and releases the request
+            if hasattr(response, 'close'):
+                response.close()
+            self.stats.add(self.slot, 'in_flight', -1)
+            self.stats.add(self.slot, 'requests', 1)
+            self.stats.add(self.slot, 'busy_seconds', time.perf_counter() - began)
+        if status and status[0][:1] == '5':
+            self.stats.add(self.slot, 'errors', 1)
+        return body
+
+
+class InheritedSocketServer(wsgi.Server):
+    # cheroot binds its own socket in prepare(); here it takes over the one the parent bound before forking
+    def __init__(self, listener, app, **kwargs):
+        super().__init__(listener.getsockname()[:2], app, **kwargs)
+        self.listener = listener
+
+    def bind(self, family, type, proto=0):
+        self.socket = self.listener
+
+
+def run_worker(app, listener, stats, slot, threads):
+    stats.set(slot, 'started', time.time())
+    app.prefix = '/'
+    cherrypy.config.update({'engine.autoreload.on': False, 'log.screen': False})
+    cherrypy.server.unsubscribe()
+    cherrypy.engine.start()
+    wsgi_app = cherrypy.tree.mount(app.getRoot(), '/')
+    server = InheritedSocketServer(listener, MetricsMiddleware(wsgi_app, stats, slot), numthreads=threads)
+    stopper = threading.Thread(target=server.stop)
+
+    def stop(signum, frame):
+        # server.stop() waits for the serve loop to exit, and that loop is on this very thread,
+        # so the stop runs on its own thread and the handler returns at once
+        if stopper.ident is None:
+            stopper.start()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.safe_start()
+    finally:
+        if stopper.ident is not None:
+            stopper.join()
+        cherrypy.engine.exit()
+    os._exit(0)
+
+
+def spawn(app, listener, stats, slot, threads):
+    pid = os.fork()
+    if pid == 0:
+        # Ctrl-C reaches the whole process group; only the parent handles it and stops the workers with SIGTERM
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        run_worker(app, listener, stats, slot, threads)
+    return pid
+
+
+def serve(app, host='0.0.0.0', port=2222, workers=None, threads=4):
+    # Pre-fork: the parent builds the app (the store is memory-mapped once and its pages are shared by all
+    # children), binds the port and forks the workers, which all accept from the same listening socket
+    workers = workers or os.cpu_count()
+    listener = socket.create_server((host, port), backlog=128)
+    stats = WorkerStats(workers)
+    children = {spawn(app, listener, stats, slot, threads): slot for slot in range(workers)}
+    print(f'Serving on http://{host}:{port} with {workers} workers, metrics at /metrics')
+
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            # A crashed worker is replaced in the same stats slot
+            print(f'Worker {pid} exited, restarting')
+            children[spawn(app, listener, stats, slot, threads)] = slot
+    listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the VHI dashboard from several worker processes')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=2222)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--refresh', action='store_true')
+    args = parser.parse_args()
+
+    dashboard = importlib.import_module('3llab')
+    dashboard.prepare_store(args.refresh)
+    serve(dashboard.StockExample(), args.host, args.port, args.workers, args.threads)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
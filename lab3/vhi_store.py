@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Year', 'Week', 'SMN', 'SMT', 'VCI', 'TCI', 'VHI', 'area']
+DTYPES = {
+    'Year': np.int16,
+    'Week': np.int8,
+    'SMN': np.float32,
+    'SMT': np.float32,
+    'VCI': np.float32,
+    'TCI': np.float32,
+    'VHI': np.float32,
+    'area': np.uint8,
+}
+OFFSETS_NAME = 'area_offsets'
+
+
+class VHIStore:
+    # Columns are read-only memory maps sorted by (area, Year, Week);
+    # rows of one area are area_offsets[area]:area_offsets[area + 1]
+    def __init__(self, columns, area_offsets):
+        self.columns = columns
+        self.area_offsets = area_offsets
+
+    def __len__(self):
+        return len(self.columns['area'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def area_slice(self, area):
+        if area < 0 or area + 1 >= len(self.area_offsets):
+            return slice(0, 0)
+        return slice(int(self.area_offsets[area]), int(self.area_offsets[area + 1]))
+
+    def to_frame(self, rows=slice(None), columns=COLUMNS):
+        return pd.DataFrame({name: self.columns[name][rows] for name in columns})
+
+
+def write_store(df, store_dir):
+    os.makedirs(store_dir, exist_ok=True)
+    df = df[COLUMNS].astype(DTYPES).sort_values(['area', 'Year', 'Week'], kind='stable')
+    area = df['area'].to_numpy()
+    area_offsets = np.searchsorted(area, np.arange(int(area.max(initial=0)) + 2)).astype(np.int64)
+    arrays = {name: df[name].to_numpy() for name in COLUMNS}
+    arrays[OFFSETS_NAME] = area_offsets
+    for name, array in arrays.items():
+        path = os.path.join(store_dir, f'{name}.npy')
+        tmp_path = os.path.join(store_dir, f'{name}.tmp.npy')
+        np.save(tmp_path, np.ascontiguousarray(array))
+        os.replace(tmp_path, path)
+
+
+def store_exists(store_dir):
+    return all(os.path.exists(os.path.join(store_dir, f'{name}.npy')) for name in COLUMNS + [OFFSETS_NAME])
+
+
+def load_store(store_dir):
+    columns = {name: np.load(os.path.join(store_dir, f'{name}.npy'), mmap_mode='r') for name in COLUMNS}
+    area_offsets = np.load(os.path.join(store_dir, f'{OFFSETS_NAME}.npy'))
+    return VHIStore(columns, area_offsets)
+
+
+def read_csv_export(file_name):
+    return pd.read_csv(file_name, dtype=DTYPES)[COLUMNS]
+
+
+def export_csv(store, file_name):
+    store.to_frame().to_csv(file_name, index=False)
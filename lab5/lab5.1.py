@@ -1,9 +1,16 @@
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+
 import numpy as np
 import dash
-from dash import dcc, html
+from dash import Patch, ctx, dcc, html
 from dash.dependencies import Input, Output, State
 import plotly.graph_objs as go
 
+from signal_core import SignalCore, StreamingSignal, apply_filter, envelope_t
+
 # Ініціалізація додатку Dash
 app = dash.Dash(__name__, external_stylesheets=['https://stackpath.bootstrapcdn.com/bootstrap/4.5.2/css/bootstrap.min.css'])
 
@@ -20,122 +27,232 @@ initial_values = {
     'show_filtered': True
 }
 
-# Параметри часу
-t = np.linspace(0, 1, 1000)
+# Параметри часу; кількість відліків можна передати першим аргументом.
+# Понад STREAM_SAMPLES відліків сигнал обробляється блоками, а в браузер ідуть лише min/max-огинаючі
+SAMPLES = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+STREAM_SAMPLES = 200000
+t = envelope_t(SAMPLES) if SAMPLES > STREAM_SAMPLES else np.linspace(0, 1, SAMPLES)
 
-# Власний фільтр
+# Власний фільтр: ковзне середнє з order відліками
 def custom_filter(signal, order, cutoff):
-    b = np.ones(order) / order
-    a = [1]
-    filtered_signal = np.convolve(signal, b, mode='same')
-    return filtered_signal
-
-# Початковий шум
-noise = np.random.normal(initial_values['noise_mean'], np.sqrt(initial_values['noise_covariance']), len(t))
-
-def generate_signals(amplitude, frequency, phase, noise_mean, noise_covariance, show_noise, filter_order, filter_cutoff, show_filtered):
-    signal = amplitude * np.sin(2 * np.pi * frequency * t + phase)
-    noise = np.random.normal(noise_mean, np.sqrt(noise_covariance), len(t))
-    noisy_signal = signal + noise if show_noise else signal
-    filtered_signal = custom_filter(noisy_signal, filter_order, filter_cutoff) if show_filtered else signal
-    
-    return signal, noisy_signal, filtered_signal
+    return apply_filter(signal, 'moving_average', order, cutoff)
+
+# Серверний кеш на сесію: свої закешовані відфільтровані складові; найстаріші сесії витісняються
+MAX_SESSIONS = 64
+sessions = OrderedDict()
+sessions_lock = threading.Lock()
+
+def noise_seed(session_id, noise_mean, noise_covariance):
+    # Шум визначається ідентифікатором сесії з dcc.Store і параметрами шуму. Ядро, створене заново після
+    # витіснення або в іншому процесі, відтворює той самий шум, що вже показаний у браузері, і Patch лише
+    # відфільтрованої траси лишається узгодженим із зашумленою
+    bits = lambda value: int(np.float64(value + 0.0).view(np.uint64))
+    return [uuid.UUID(session_id).int, bits(noise_mean), bits(noise_covariance)]
+
+def session_core(session_id, noise_mean, noise_covariance):
+    seed = noise_seed(session_id, noise_mean, noise_covariance)
+    with sessions_lock:
+        session = sessions.pop(session_id, None)
+        if session is None:
+            if SAMPLES > STREAM_SAMPLES:
+                core = StreamingSignal(SAMPLES, kind='moving_average', seed=seed)
+            else:
+                core = SignalCore(t, kind='moving_average', seed=seed)
+            session = {'core': core, 'noise': (noise_mean, noise_covariance)}
+        elif session['noise'] != (noise_mean, noise_covariance):
+            # Новий шум лише при зміні його параметрів
+            session['core'].new_noise(seed)
+            session['noise'] = (noise_mean, noise_covariance)
+        sessions[session_id] = session
+        while len(sessions) > MAX_SESSIONS:
+            sessions.popitem(last=False)
+    return session['core']
+
+def generate_signals(session_id, amplitude, frequency, phase, noise_mean, noise_covariance, show_noise, filter_order, filter_cutoff, show_filtered):
+    core = session_core(session_id, noise_mean, noise_covariance)
+    return core.signals(amplitude, frequency, phase, noise_mean, noise_covariance, show_noise, filter_order, filter_cutoff, show_filtered)
+
+# Які траси (0 - сигнал, 1 - зашумлений, 2 - відфільтрований) змінює кожен елемент керування
+TRACES_BY_INPUT = {
+    'amplitude-slider': {0, 1, 2},
+    'frequency-slider': {0, 1, 2},
+    'phase-slider': {0, 1, 2},
+    'noise-mean-slider': {1, 2},
+    'noise-covariance-slider': {1, 2},
+    'filter-order-slider': {2},
+    'filter-cutoff-slider': {2},
+    'show-options': {1, 2},
+}
+
+# Слайдери в порядку параметрів generate_signals і їх початкові значення
+SLIDERS = {
+    'amplitude-slider': initial_values['amplitude'],
+    'frequency-slider': initial_values['frequency'],
+    'phase-slider': initial_values['phase'],
+    'noise-mean-slider': initial_values['noise_mean'],
+    'noise-covariance-slider': initial_values['noise_covariance'],
+    'filter-order-slider': initial_values['filter_order'],
+    'filter-cutoff-slider': initial_values['filter_cutoff'],
+}
 
-# Візуалізація інтерфейсу
-app.layout = html.Div([
-    html.Div([
-        html.H1("Harmonic Signal with Noise and Custom Filter"),
-    ], className='text-center'),
+# Під час перетягування графік оновлюється по drag_value, але не частіше ніж раз на THROTTLE_MS:
+# проміжні значення накопичуються в браузері, і на сервер іде лише останнє разом зі списком змінених слайдерів
+THROTTLE_MS = 150
 
-    dcc.Graph(id='signal-plot'),
+# Візуалізація інтерфейсу; макет будується на кожне відкриття сторінки, щоб кожна сесія мала свій ідентифікатор
+def serve_layout():
+    return html.Div([
+        dcc.Store(id='session-id', data=str(uuid.uuid4())),
+        dcc.Store(id='slider-values', data={'values': SLIDERS, 'changed': []}),
+        html.Div([
+            html.H1("Harmonic Signal with Noise and Custom Filter"),
+        ], className='text-center'),
+
+        dcc.Graph(id='signal-plot'),
     
-    html.Div([
         html.Div([
-            html.Label('Amplitude'),
-            dcc.Slider(
-                id='amplitude-slider', 
-                min=0.1, max=5.0, step=0.1, value=initial_values['amplitude'],
-                marks={i: str(i) for i in np.arange(0.1, 5.1, 1.0)}
-            ),
-            html.Label('Frequency'),
-            dcc.Slider(
-                id='frequency-slider', 
-                min=0.1, max=5.0, step=0.1, value=initial_values['frequency'],
-                marks={i: str(i) for i in np.arange(0.1, 5.1, 1.0)}
-            ),
-            html.Label('Phase'),
-            dcc.Slider(
-                id='phase-slider', 
-                min=0.0, max=2*np.pi, step=0.1, value=initial_values['phase'],
-                marks={i: f'{i:.1f}' for i in np.arange(0.0, 2*np.pi+0.1, np.pi/2)}
-            ),
-        ], className='col'),
+            html.Div([
+                html.Label('Amplitude'),
+                dcc.Slider(
+                    id='amplitude-slider', 
+                    min=0.1, max=5.0, step=0.1, value=initial_values['amplitude'],
+                    marks={i: str(i) for i in np.arange(0.1, 5.1, 1.0)},
+                    drag_value=SLIDERS['amplitude-slider']
+                ),
+                html.Label('Frequency'),
+                dcc.Slider(
+                    id='frequency-slider', 
+                    min=0.1, max=5.0, step=0.1, value=initial_values['frequency'],
+                    marks={i: str(i) for i in np.arange(0.1, 5.1, 1.0)},
+                    drag_value=SLIDERS['frequency-slider']
+                ),
+                html.Label('Phase'),
+                dcc.Slider(
+                    id='phase-slider', 
+                    min=0.0, max=2*np.pi, step=0.1, value=initial_values['phase'],
+                    marks={i: f'{i:.1f}' for i in np.arange(0.0, 2*np.pi+0.1, np.pi/2)},
+                    drag_value=SLIDERS['phase-slider']
+                ),
+            ], className='col'),
         
-        html.Div([
-            html.Label('Noise Mean'),
-            dcc.Slider(
-                id='noise-mean-slider', 
-                min=-1.0, max=1.0, step=0.1, value=initial_values['noise_mean'],
-                marks={i: str(i) for i in np.arange(-1.0, 1.1, 0.5)}
-            ),
-            html.Label('Noise Covariance'),
-            dcc.Slider(
-                id='noise-covariance-slider', 
-                min=0.01, max=1.0, step=0.01, value=initial_values['noise_covariance'],
-                marks={i: f'{i:.2f}' for i in np.arange(0.01, 1.01, 0.2)}
-            ),
-            html.Label('Filter Order'),
-            dcc.Slider(
-                id='filter-order-slider', 
-                min=1, max=10, step=1, value=initial_values['filter_order'],
-                marks={i: str(i) for i in range(1, 11)}
-            ),
-            html.Label('Filter Cutoff'),
-            dcc.Slider(
-                id='filter-cutoff-slider', 
-                min=0.01, max=0.5, step=0.01, value=initial_values['filter_cutoff'],
-                marks={i: f'{i:.2f}' for i in np.arange(0.01, 0.51, 0.1)}
-            ),
-        ], className='col'),
+            html.Div([
+                html.Label('Noise Mean'),
+                dcc.Slider(
+                    id='noise-mean-slider', 
+                    min=-1.0, max=1.0, step=0.1, value=initial_values['noise_mean'],
+                    marks={i: str(i) for i in np.arange(-1.0, 1.1, 0.5)},
+                    drag_value=SLIDERS['noise-mean-slider']
+                ),
+                html.Label('Noise Covariance'),
+                dcc.Slider(
+                    id='noise-covariance-slider', 
+                    min=0.01, max=1.0, step=0.01, value=initial_values['noise_covariance'],
+                    marks={i: f'{i:.2f}' for i in np.arange(0.01, 1.01, 0.2)},
+                    drag_value=SLIDERS['noise-covariance-slider']
+                ),
+                html.Label('Filter Order'),
+                dcc.Slider(
+                    id='filter-order-slider', 
+                    min=1, max=10, step=1, value=initial_values['filter_order'],
+                    marks={i: str(i) for i in range(1, 11)},
+                    drag_value=SLIDERS['filter-order-slider']
+                ),
+                html.Label('Filter Cutoff'),
+                dcc.Slider(
+                    id='filter-cutoff-slider', 
+                    min=0.01, max=0.5, step=0.01, value=initial_values['filter_cutoff'],
+                    marks={i: f'{i:.2f}' for i in np.arange(0.01, 0.51, 0.1)},
+                    drag_value=SLIDERS['filter-cutoff-slider']
+                ),
+            ], className='col'),
 
-        html.Div([
-            dcc.Checklist(
-                id='show-options',
-                options=[
-                    {'label': 'Show Noisy Signal', 'value': 'show_noise'},
-                    {'label': 'Show Filtered Signal', 'value': 'show_filtered'}
-                ],
-                value=['show_noise', 'show_filtered']
-            ),
-            html.Button('Reset', id='reset-button', n_clicks=0)
-        ], className='col'),
-    ], className='row'),
-])
+            html.Div([
+                dcc.Checklist(
+                    id='show-options',
+                    options=[
+                        {'label': 'Show Noisy Signal', 'value': 'show_noise'},
+                        {'label': 'Show Filtered Signal', 'value': 'show_filtered'}
+                    ],
+                    value=['show_noise', 'show_filtered']
+                ),
+                html.Button('Reset', id='reset-button', n_clicks=0)
+            ], className='col'),
+        ], className='row'),
+    ])
+
+app.layout = serve_layout
+
+# Троттлінг у браузері: перша зміна йде одразу, наступні в межах THROTTLE_MS чекають на таймер,
+# який надсилає останні значення через set_props, тож кінцеве положення слайдера не губиться
+app.clientside_callback(
+    """
+    function() {
+        var ids = IDS;
+        var values = arguments;
+        var state = window.sliderThrottle = window.sliderThrottle || {last: 0, timer: null, changed: {}};
+        dash_clientside.callback_context.triggered.forEach(function(item) {
+            state.changed[item.prop_id.split('.')[0]] = true;
+        });
+        state.values = {};
+        ids.forEach(function(id, i) { state.values[id] = values[i]; });
+
+        function flush() {
+            state.last = Date.now();
+            state.timer = null;
+            var data = {values: state.values, changed: Object.keys(state.changed)};
+            state.changed = {};
+            return data;
+        }
+
+        var wait = THROTTLE_MS - (Date.now() - state.last);
+        if (wait <= 0 && !state.timer) {
+            return flush();
+        }
+        if (!state.timer) {
+            state.timer = setTimeout(function() {
+                dash_clientside.set_props('slider-values', {data: flush()});
+            }, wait);
+        }
+        return dash_clientside.no_update;
+    }
+    """.replace('IDS', str(list(SLIDERS))).replace('THROTTLE_MS', str(THROTTLE_MS)),
+    Output('slider-values', 'data'),
+    [Input(name, 'drag_value') for name in SLIDERS],
+    prevent_initial_call=True
+)
 
 @app.callback(
     Output('signal-plot', 'figure'),
-    Input('amplitude-slider', 'value'),
-    Input('frequency-slider', 'value'),
-    Input('phase-slider', 'value'),
-    Input('noise-mean-slider', 'value'),
-    Input('noise-covariance-slider', 'value'),
-    Input('filter-order-slider', 'value'),
-    Input('filter-cutoff-slider', 'value'),
+    Input('slider-values', 'data'),
     Input('show-options', 'value'),
-    Input('reset-button', 'n_clicks')
+    Input('reset-button', 'n_clicks'),
+    State('session-id', 'data')
 )
-def update_plot(amplitude, frequency, phase, noise_mean, noise_covariance, filter_order, filter_cutoff, show_options, n_clicks):
+def update_plot(sliders, show_options, n_clicks, session_id):
+    amplitude, frequency, phase, noise_mean, noise_covariance, filter_order, filter_cutoff = (
+        sliders['values'][name] for name in SLIDERS)
     show_noise = 'show_noise' in show_options
     show_filtered = 'show_filtered' in show_options
     
     signal, noisy_signal, filtered_signal = generate_signals(
-        amplitude, frequency, phase, noise_mean, noise_covariance, show_noise, filter_order, filter_cutoff, show_filtered
+        session_id, amplitude, frequency, phase, noise_mean, noise_covariance, show_noise, filter_order, filter_cutoff, show_filtered
     )
+    ys = [signal, noisy_signal if show_noise else [], filtered_signal if show_filtered else []]
+
+    # Перший виклик і Reset віддають повну фігуру, решта - лише y змінених трас через Patch
+    triggered = {prop.rsplit('.', 1)[0] for prop in ctx.triggered_prop_ids}
+    if 'slider-values' in triggered:
+        triggered = (triggered - {'slider-values'}) | set(sliders['changed'])
+    if triggered and triggered <= set(TRACES_BY_INPUT):
+        patch = Patch()
+        for index in sorted(set().union(*(TRACES_BY_INPUT[name] for name in triggered))):
+            patch['data'][index]['y'] = ys[index]
+        return patch
     
     traces = [
-        go.Scatter(x=t, y=signal, mode='lines', name='Signal'),
-        go.Scatter(x=t, y=noisy_signal, mode='lines', name='Noisy Signal') if show_noise else go.Scatter(x=t, y=[], mode='lines', name='Noisy Signal'),
-        go.Scatter(x=t, y=filtered_signal, mode='lines', name='Filtered Signal') if show_filtered else go.Scatter(x=t, y=[], mode='lines', name='Filtered Signal')
+        go.Scatter(x=t, y=ys[0], mode='lines', name='Signal'),
+        go.Scatter(x=t, y=ys[1], mode='lines', name='Noisy Signal'),
+        go.Scatter(x=t, y=ys[2], mode='lines', name='Filtered Signal')
     ]
     
     layout = go.Layout(
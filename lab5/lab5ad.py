@@ -1,13 +1,16 @@
+import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 warnings.filterwarnings("ignore", message="Unable to import Axes3D")
 
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from scipy.signal import butter, filtfilt
 import tkinter as tk
 from tkinter import ttk
 
+from signal_core import SignalCore, StreamingSignal
+
 # Початкові значення параметрів
 initial_values = {
     'amplitude': 1.0,
@@ -21,26 +24,42 @@ initial_values = {
     'show_filtered': True
 }
 
-# Параметри часу
-t = np.linspace(0, 1, 1000)
-
-# Ініціалізація змінних
-last_noise_covariance = initial_values['noise_covariance']
-last_noise_mean = initial_values['noise_mean']
+# Параметри часу; кількість відліків можна передати першим аргументом.
+# Понад STREAM_SAMPLES відліків сигнал генерується і фільтрується блоками, а на графік іде лише min/max-огинаюча
+SAMPLES = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+STREAM_SAMPLES = 200000
+
+# Ініціалізація змінних: шум генерується один раз, коефіцієнти Баттерворта і відфільтровані складові кешуються в core
+if SAMPLES > STREAM_SAMPLES:
+    core = StreamingSignal(SAMPLES, kind='butter')
+    t = core.t
+else:
+    t = np.linspace(0, 1, SAMPLES)
+    core = SignalCore(t, kind='butter')
 signal = np.zeros_like(t)
 noisy_signal = np.zeros_like(t)
-original_noisy_signal = np.zeros_like(t)
 filtered_signal = np.zeros_like(t)
-noise = np.random.normal(initial_values['noise_mean'], np.sqrt(initial_values['noise_covariance']), len(t))
 signal_color = 'blue'
 noisy_signal_color = 'lightpink'
 filtered_signal_color = 'green'
 
+# Події слайдерів збираються за один кадр (FRAME_MS), розрахунок іде в окремому потоці,
+# а результат забирається в головний цикл Tk опитуванням через after()
+FRAME_MS = 16
+POLL_MS = 5
+executor = ThreadPoolExecutor(max_workers=1)
+scheduled_update = None
+computing = None
+requested = None
+background = None
+shown_lines = None
+
 def create_plot():
     fig, ax1 = plt.subplots(figsize=(10, 6))
-    line_signal, = ax1.plot(t, signal, label='Signal', color=signal_color)
-    line_noisy_signal, = ax1.plot(t, noisy_signal, label='Noisy Signal', color=noisy_signal_color)
-    line_filtered_signal, = ax1.plot(t, filtered_signal, label='Filtered Signal', color=filtered_signal_color)
+    # animated=True: лінії не входять у закешований фон і перемальовуються поверх нього блітингом
+    line_signal, = ax1.plot(t, signal, label='Signal', color=signal_color, animated=True)
+    line_noisy_signal, = ax1.plot(t, noisy_signal, label='Noisy Signal', color=noisy_signal_color, animated=True)
+    line_filtered_signal, = ax1.plot(t, filtered_signal, label='Filtered Signal', color=filtered_signal_color, animated=True)
     ax1.legend()
     ax1.set_xlabel('Time')
     ax1.set_ylabel('Amplitude')
@@ -48,66 +67,98 @@ def create_plot():
     ax1.grid(True)
     return fig, ax1, line_signal, line_noisy_signal, line_filtered_signal
 
-def harmonic_with_noise(t, amplitude, frequency, phase, noise_mean, noise_covariance, show_noise=True):
-    global noise, last_noise_covariance, signal, noisy_signal, original_noisy_signal, last_noise_mean
-    
-    if noise_mean != last_noise_mean or last_noise_covariance != noise_covariance:
-        noise = np.random.normal(noise_mean, np.sqrt(noise_covariance), len(t))
-        last_noise_covariance = noise_covariance
-        last_noise_mean = noise_mean
-    
-    signal = amplitude * np.sin(2 * np.pi * frequency * t + phase)
-    original_noisy_signal = signal + noise
-    
-    if show_noise:
-        noisy_signal = original_noisy_signal
-    else:
-        noisy_signal = signal
-    
-    update_filtered_signal()
-
-def update_filtered_signal():
-    global filtered_signal
-    filter_order = filter_order_var.get()
-    filter_cutoff = filter_cutoff_slider.get()
-    b, a = butter(filter_order, filter_cutoff, btype='low')
-    filtered_signal = filtfilt(b, a, noisy_signal)
+def harmonic_with_noise(t, amplitude, frequency, phase, noise_mean, noise_covariance, show_noise=True, filter_order=3, filter_cutoff=0.1):
+    # Виконується в робочому потоці, тому не звертається до віджетів Tk
+    return core.signals(amplitude, frequency, phase, noise_mean, noise_covariance, show_noise, filter_order, filter_cutoff, True)
+
+def read_params():
+    return {
+        'amplitude': amplitude_slider.get(),
+        'frequency': frequency_slider.get(),
+        'phase': phase_slider.get(),
+        'noise_mean': noise_mean_slider.get(),
+        'noise_covariance': noise_covariance_slider.get(),
+        'show_noise': show_noise_var.get(),
+        'filter_order': int(filter_order_var.get()),
+        'filter_cutoff': filter_cutoff_slider.get(),
+    }
 
 def update_plot(val):
-    amplitude = amplitude_slider.get()
-    frequency = frequency_slider.get()
-    phase = phase_slider.get()
-    noise_mean = noise_mean_slider.get()
-    noise_covariance = noise_covariance_slider.get()
+    global scheduled_update
+    if scheduled_update is None:
+        scheduled_update = root.after(FRAME_MS, start_update)
+
+def start_update():
+    global scheduled_update, requested
+    scheduled_update = None
+    requested = read_params()
+    if computing is None:
+        submit_update()
+
+def submit_update():
+    global computing, requested
+    params, requested = requested, None
+    computing = executor.submit(harmonic_with_noise, t, **params)
+    root.after(POLL_MS, poll_update)
+
+def poll_update():
+    global computing, signal, noisy_signal, filtered_signal
+    if not computing.done():
+        root.after(POLL_MS, poll_update)
+        return
+    future, computing = computing, None
+    signal, noisy_signal, filtered_signal = future.result()
+    # Поки рахувався цей кадр, слайдери могли зрушити - одразу рахуємо останні параметри
+    if requested is not None:
+        submit_update()
+    draw_signals()
+
+def on_draw(event):
+    global background
+    background = canvas.copy_from_bbox(fig.bbox)
+    draw_lines()
+
+def draw_lines():
+    for line in (line_signal, line_noisy_signal, line_filtered_signal):
+        if line.get_visible():
+            ax1.draw_artist(line)
+
+def draw_signals():
+    global shown_lines
     show_noise = show_noise_var.get()
     show_filtered = show_filtered_var.get()
     
-    harmonic_with_noise(t, amplitude, frequency, phase, noise_mean, noise_covariance, show_noise)
-    
     line_signal.set_ydata(signal)
     line_noisy_signal.set_ydata(noisy_signal)
     line_filtered_signal.set_ydata(filtered_signal)
     
     if show_noise and show_filtered:
-        ax1.set_title('Harmonic Signal with Noise and Filtered Signal')
-        line_noisy_signal.set_visible(True)
-        line_filtered_signal.set_visible(True)
+        title = 'Harmonic Signal with Noise and Filtered Signal'
     elif show_noise:
-        ax1.set_title('Harmonic Signal with Noise')
-        line_noisy_signal.set_visible(True)
-        line_filtered_signal.set_visible(False)
+        title = 'Harmonic Signal with Noise'
     elif show_filtered:
-        ax1.set_title('Harmonic Signal and Filtered Signal')
-        line_noisy_signal.set_visible(False)
-        line_filtered_signal.set_visible(True)
+        title = 'Harmonic Signal and Filtered Signal'
     else:
-        ax1.set_title('Harmonic Signal')
-        line_noisy_signal.set_visible(False)
-        line_filtered_signal.set_visible(False)
-    
-    ax1.relim()
-    ax1.autoscale_view()
-    fig.canvas.draw()
+        title = 'Harmonic Signal'
+    line_noisy_signal.set_visible(show_noise)
+    line_filtered_signal.set_visible(show_filtered)
+
+    # Повне перемальовування лише коли змінюється фон: заголовок або межі осі Y; інакше - блітинг ліній
+    visible = [line.get_ydata() for line in (line_signal, line_noisy_signal, line_filtered_signal) if line.get_visible()]
+    low = min(np.min(y) for y in visible)
+    high = max(np.max(y) for y in visible)
+    bottom, top = ax1.get_ylim()
+    margin = 0.05 * (high - low or 1.0)
+    if (background is None or (show_noise, show_filtered) != shown_lines or low < bottom or high > top or
+            high - low < 0.5 * (top - bottom)):
+        shown_lines = (show_noise, show_filtered)
+        ax1.set_title(title)
+        ax1.set_ylim(low - margin, high + margin)
+        canvas.draw()
+    else:
+        canvas.restore_region(background)
+        draw_lines()
+        canvas.blit(fig.bbox)
 
 def reset_values():
     amplitude_slider.set(initial_values['amplitude'])
@@ -128,6 +179,7 @@ root.title("Harmonic Signal with Noise")
 fig, ax1, line_signal, line_noisy_signal, line_filtered_signal = create_plot()
 canvas = FigureCanvasTkAgg(fig, master=root)
 canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
+canvas.mpl_connect('draw_event', on_draw)
 
 controls_frame = ttk.Frame(root)
 controls_frame.pack(side=tk.BOTTOM, fill=tk.X)
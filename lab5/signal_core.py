@@ -0,0 +1,195 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import butter, convolve, fftconvolve, sosfilt, sosfilt_zi, sosfiltfilt
+
+
+def harmonic(t, amplitude, frequency, phase):
+    return amplitude * np.sin(2 * np.pi * frequency * t + phase)
+
+
+# Коефіцієнти фільтрів проєктуються один раз: Баттерворт - на пару (order, cutoff),
+# ковзне середнє - на order (cutoff у ньому, як і раніше, не використовується)
+@lru_cache(maxsize=256)
+def butter_sos(order, cutoff):
+    return butter(int(order), cutoff, btype='low', output='sos')
+
+
+@lru_cache(maxsize=256)
+def moving_average(order):
+    kernel = np.ones(int(order)) / int(order)
+    kernel.setflags(write=False)
+    return kernel
+
+
+def apply_filter(x, kind, order, cutoff):
+    # x - один сигнал або пакет сигналів у рядках, фільтрація вздовж останньої осі
+    if kind == 'butter':
+        return sosfiltfilt(butter_sos(order, cutoff), x, axis=-1)
+    x = np.asarray(x, dtype=np.float64)
+    kernel = moving_average(order)
+    return fftconvolve(x, kernel.reshape((1,) * (x.ndim - 1) + (-1,)), mode='same', axes=-1)
+
+
+def filter_bank(x, kind, settings):
+    # Один сигнал через набір налаштувань [(order, cutoff), ...] -> масив (len(settings), len(x)).
+    # Для ковзного середнього кожен порядок згортається один раз, незалежно від кількості значень cutoff
+    x = np.asarray(x, dtype=np.float64)
+    result = np.empty((len(settings), len(x)))
+    if kind == 'butter':
+        for row, (order, cutoff) in enumerate(settings):
+            result[row] = sosfiltfilt(butter_sos(order, cutoff), x)
+        return result
+    by_order = {}
+    for row, (order, cutoff) in enumerate(settings):
+        by_order.setdefault(int(order), []).append(row)
+    for order, rows in by_order.items():
+        result[rows] = fftconvolve(x, moving_average(order), mode='same')
+    return result
+
+
+class SignalCore:
+    # Фільтр лінійний, тож filter(A·sin + mean + σ·z) = A·filter(sin) + mean·filter(1) + σ·filter(z).
+    # Відфільтровані складові кешуються, і зміна амплітуди чи параметрів шуму не запускає фільтр знову
+    def __init__(self, t, kind='butter', seed=None, cache_size=64):
+        self.t = t
+        self.kind = kind
+        self.rng = np.random.default_rng(seed)
+        self.new_noise()
+        self.filtered_wave = lru_cache(maxsize=cache_size)(self._filtered_wave)
+        self.filtered_constant = lru_cache(maxsize=cache_size)(self._filtered_constant)
+        self.filtered_noise = lru_cache(maxsize=cache_size)(self._filtered_noise)
+
+    def new_noise(self, seed=None):
+        # Стандартний шум генерується один раз і лише масштабується під noise_mean і noise_covariance;
+        # з seed шум відтворюваний
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.base_noise = self.rng.standard_normal(len(self.t))
+        if hasattr(self, 'filtered_noise'):
+            self.filtered_noise.cache_clear()
+
+    def noise(self, noise_mean, noise_covariance):
+        return noise_mean + np.sqrt(noise_covariance) * self.base_noise
+
+    def _filtered_wave(self, frequency, phase, order, cutoff):
+        return apply_filter(harmonic(self.t, 1.0, frequency, phase), self.kind, order, cutoff)
+
+    def _filtered_constant(self, order, cutoff):
+        return apply_filter(np.ones(len(self.t)), self.kind, order, cutoff)
+
+    def _filtered_noise(self, order, cutoff):
+        return apply_filter(self.base_noise, self.kind, order, cutoff)
+
+    def signals(self, amplitude, frequency, phase, noise_mean, noise_covariance, show_noise, order, cutoff,
+                show_filtered):
+        signal = harmonic(self.t, amplitude, frequency, phase)
+        noisy_signal = signal + self.noise(noise_mean, noise_covariance) if show_noise else signal
+        if not show_filtered:
+            return signal, noisy_signal, signal
+        filtered_signal = amplitude * self.filtered_wave(frequency, phase, order, cutoff)
+        if show_noise:
+            filtered_signal = (filtered_signal + noise_mean * self.filtered_constant(order, cutoff) +
+                               np.sqrt(noise_covariance) * self.filtered_noise(order, cutoff))
+        return signal, noisy_signal, filtered_signal
+
+    def signals_batch(self, settings):
+        # Пакет словників з параметрами signals() -> масиви (len(settings), len(t)) для кожного з трьох сигналів
+        return tuple(np.stack(parts) for parts in zip(*(self.signals(**setting) for setting in settings)))
+
+
+class ButterStream:
+    # Причинна фільтрація по блоках: стан zi переноситься між блоками, тож результат не залежить від їх розміру
+    def __init__(self, order, cutoff):
+        self.sos = butter_sos(order, cutoff)
+        self.zi = None
+
+    def process(self, block):
+        if self.zi is None:
+            self.zi = sosfilt_zi(self.sos) * block[0]
+        filtered, self.zi = sosfilt(self.sos, block, zi=self.zi)
+        return filtered
+
+
+class MovingAverageStream:
+    # Overlap-save: до блоку додаються останні order-1 відліків попереднього, і береться лише повна частина згортки
+    def __init__(self, order, cutoff):
+        self.kernel = moving_average(order)
+        self.tail = None
+
+    def process(self, block):
+        if self.tail is None:
+            self.tail = np.full(len(self.kernel) - 1, block[0])
+        extended = np.concatenate([self.tail, block])
+        self.tail = extended[len(extended) - len(self.tail):]
+        return convolve(extended, self.kernel, mode='valid')
+
+
+STREAM_FILTERS = {'butter': ButterStream, 'moving_average': MovingAverageStream}
+
+
+def envelope_t(samples, duration=1.0, width=2000):
+    # Час початку кожного кошика огинаючої, повторений двічі - для мінімуму і максимуму
+    bin_size = -(-samples // width)
+    return np.repeat(duration * np.arange(0, samples, bin_size) / max(samples - 1, 1), 2)
+
+
+class Envelope:
+    # Мінімум і максимум кожних bin_size відліків; неповний кошик переноситься в наступний блок
+    def __init__(self, bin_size):
+        self.bin_size = bin_size
+        self.tail = np.empty(0)
+        self.low = []
+        self.high = []
+
+    def update(self, block):
+        data = np.concatenate([self.tail, block])
+        full = len(data) // self.bin_size * self.bin_size
+        bins = data[:full].reshape(-1, self.bin_size)
+        self.low.append(bins.min(axis=1))
+        self.high.append(bins.max(axis=1))
+        self.tail = data[full:]
+
+    def finish(self):
+        if len(self.tail):
+            self.update(np.full(self.bin_size - len(self.tail), self.tail[-1]))
+        # Мінімум і максимум кошика чергуються, тож лінія з 2·width точок малює смугу огинаючої
+        return np.column_stack([np.concatenate(self.low), np.concatenate(self.high)]).ravel()
+
+
+class StreamingSignal:
+    # Той самий інтерфейс signals(), що й у SignalCore, але сигнал генерується і фільтрується блоками
+    # по block_size відліків, а назад повертаються лише огинаючі з width кошиків для відображення.
+    # Фільтр тут причинний (sosfilt / overlap-save), а не двобічний, як у SignalCore
+    def __init__(self, samples, duration=1.0, kind='butter', width=2000, block_size=1 << 16, seed=None):
+        self.samples = samples
+        self.duration = duration
+        self.kind = kind
+        self.block_size = block_size
+        self.bin_size = -(-samples // width)
+        self.rng = np.random.default_rng(seed)
+        self.new_noise()
+        self.t = envelope_t(samples, duration, width)
+
+    def new_noise(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.noise_seed = int(self.rng.integers(2 ** 63))
+
+    def blocks(self):
+        for start in range(0, self.samples, self.block_size):
+            index = np.arange(start, min(start + self.block_size, self.samples))
+            yield self.duration * index / max(self.samples - 1, 1)
+
+    def signals(self, amplitude, frequency, phase, noise_mean, noise_covariance, show_noise, order, cutoff,
+                show_filtered):
+        noise_rng = np.random.default_rng(self.noise_seed)
+        stream = STREAM_FILTERS[self.kind](order, cutoff)
+        envelopes = [Envelope(self.bin_size) for _ in range(3)]
+        for t in self.blocks():
+            signal = harmonic(t, amplitude, frequency, phase)
+            noisy_signal = signal + noise_mean + np.sqrt(noise_covariance) * noise_rng.standard_normal(len(t)) if show_noise else signal
+            filtered_signal = stream.process(noisy_signal) if show_filtered else signal
+            for envelope, block in zip(envelopes, (signal, noisy_signal, filtered_signal)):
+                envelope.update(block)
+        return tuple(envelope.finish() for envelope in envelopes)
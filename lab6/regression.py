@@ -0,0 +1,254 @@
+import numpy as np
+
+
+class GradientDescent:
+    # Пряма y = k·x + b для S незалежних рядів одночасно: параметри зберігаються як масив (S, 2) [k, b],
+    # а кожен ряд зупиняється окремо, коли зміна його помилки менша за review.
+    # Пропуски (NaN у y) не враховуються, тож ряди різної довжини доповнюються NaN до спільної ширини
+    def __init__(self, learning_rate=0.01, optimizer='sgd', beta=0.9, beta2=0.999, eps=1e-8):
+        self.learning_rate = learning_rate
+        self.optimizer = optimizer
+        self.beta = beta
+        self.beta2 = beta2
+        self.eps = eps
+        self.params = None
+
+    @property
+    def k(self):
+        return self.params[:, 0]
+
+    @property
+    def b(self):
+        return self.params[:, 1]
+
+    def reset(self, n_series):
+        self.params = np.zeros((n_series, 2))
+        self.velocity = np.zeros((n_series, 2))
+        self.second = np.zeros((n_series, 2))
+        self.steps = np.zeros(n_series, dtype=np.int64)
+        self.active = np.ones(n_series, dtype=bool)
+        self.iterations = np.zeros(n_series, dtype=np.int64)
+
+    @staticmethod
+    def prepare(x, y):
+        # Маска пропусків і заповнені масиви рахуються один раз на виклик, а не на кожній ітерації
+        y = np.atleast_2d(np.asarray(y, dtype=np.float64))
+        x = np.broadcast_to(np.asarray(x, dtype=np.float64), y.shape)
+        valid = ~np.isnan(y)
+        if valid.all():
+            return x, y, None, np.full(len(y), y.shape[1])
+        return np.where(valid, x, 0.0), np.where(valid, y, 0.0), valid, valid.sum(axis=1)
+
+    def loss_and_gradient(self, params, x, y, valid, count):
+        # Одна різниця mistake дає і середню абсолютну помилку, і градієнт квадратичної втрати
+        mistake = params[:, :1] * x + params[:, 1:] - y
+        if valid is not None:
+            mistake *= valid
+        with np.errstate(invalid='ignore', divide='ignore'):
+            loss = np.abs(mistake).sum(axis=1) / count
+            gradient = np.column_stack([np.einsum('ij,ij->i', mistake, x), mistake.sum(axis=1)]) / count[:, None]
+        return loss, np.nan_to_num(gradient)
+
+    def update(self, rows, gradient):
+        # rows - номери рядів, що ще не зупинились; gradient - лише для цих рядів
+        self.steps[rows] += 1
+        if self.optimizer == 'momentum':
+            self.velocity[rows] = self.beta * self.velocity[rows] + gradient
+            step = self.velocity[rows]
+        elif self.optimizer == 'adam':
+            self.velocity[rows] = self.beta * self.velocity[rows] + (1 - self.beta) * gradient
+            self.second[rows] = self.beta2 * self.second[rows] + (1 - self.beta2) * gradient ** 2
+            steps = self.steps[rows][:, None]
+            step = ((self.velocity[rows] / (1 - self.beta ** steps)) /
+                    (np.sqrt(self.second[rows] / (1 - self.beta2 ** steps)) + self.eps))
+        else:
+            step = gradient
+        self.params[rows] -= self.learning_rate * step
+
+    def stop(self, history, i, review):
+        # Повертає номери рядів, що лишились активними після кроку i
+        if i > 0:
+            self.active &= ~(np.abs(history[i] - history[i - 1]) < review)
+        return np.flatnonzero(self.active)
+
+    @staticmethod
+    def select(data, rows):
+        return tuple(None if part is None else part[rows] for part in data)
+
+    def fit(self, x, y, n_iter=1000, review=0.0001):
+        # x - (N,) спільний для всіх рядів або (S, N); y - (S, N)
+        data = self.prepare(x, y)
+        n_series = len(data[1])
+        self.reset(n_series)
+        # Історія помилок виділяється одразу; після зупинки ряду в ній лишаються NaN
+        self.history = np.full((n_iter, n_series), np.nan)
+        rows = np.arange(n_series)
+        current = data
+        for i in range(n_iter):
+            loss, gradient = self.loss_and_gradient(self.params[rows], *current)
+            self.history[i, rows] = loss
+            self.update(rows, gradient)
+            self.iterations[rows] = i + 1
+            active = self.stop(self.history, i, review)
+            if not len(active):
+                break
+            # Дані стискаються до активних рядів лише тоді, коли хтось зупинився
+            if len(active) < len(rows):
+                rows = active
+                current = self.select(data, rows)
+        return self
+
+    def fit_stream(self, batches, n_series, epochs=10, review=0.0001):
+        # batches - функція, що на кожну епоху повертає новий ітератор пар (x, y) з y форми (S, B);
+        # дані читаються частинами, тож можуть не вміщатися в пам'ять
+        self.reset(n_series)
+        self.history = np.full((epochs, n_series), np.nan)
+        rows = np.arange(n_series)
+        for epoch in range(epochs):
+            total = np.zeros(len(rows))
+            counted = np.zeros(len(rows))
+            for x, y in batches():
+                x, y, valid, count = self.select(self.prepare(x, y), rows)
+                loss, gradient = self.loss_and_gradient(self.params[rows], x, y, valid, count)
+                total += np.nan_to_num(loss) * count
+                counted += count
+                self.update(rows, gradient)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.history[epoch, rows] = total / counted
+            self.iterations[rows] = epoch + 1
+            rows = self.stop(self.history, epoch, review)
+            if not len(rows):
+                break
+        return self
+
+    def predict(self, x):
+        return self.params[:, :1] * np.asarray(x) + self.params[:, 1:]
+
+
+class LeastSquares:
+    # Достатні статистики прямої y = k·x + b по групах за один прохід: кількість, середні і центровані суми
+    # Σ(x-x̄)², Σ(x-x̄)(y-ȳ), Σ(y-ȳ)². Частини й акумулятори різних процесів зливаються формулою Чана
+    def __init__(self, n_groups=1):
+        self.count = np.zeros(n_groups)
+        self.mean_x = np.zeros(n_groups)
+        self.mean_y = np.zeros(n_groups)
+        self.sxx = np.zeros(n_groups)
+        self.sxy = np.zeros(n_groups)
+        self.syy = np.zeros(n_groups)
+
+    def grow(self, n_groups):
+        for name in ('count', 'mean_x', 'mean_y', 'sxx', 'sxy', 'syy'):
+            values = getattr(self, name)
+            setattr(self, name, np.concatenate([values, np.zeros(n_groups - len(values))]))
+
+    def update(self, x, y, groups=None):
+        # groups - цілі номери груп (наприклад, ProvinceId); рядки з NaN пропускаються
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        groups = np.zeros(len(x), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64).ravel()
+        keep = ~(np.isnan(x) | np.isnan(y))
+        x, y, groups = x[keep], y[keep], groups[keep]
+        if len(groups) and groups.max() >= len(self.count):
+            self.grow(groups.max() + 1)
+
+        n = len(self.count)
+        count = np.bincount(groups, minlength=n).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x = np.nan_to_num(np.bincount(groups, x, n) / count)
+            mean_y = np.nan_to_num(np.bincount(groups, y, n) / count)
+        dx = x - mean_x[groups]
+        dy = y - mean_y[groups]
+        self.combine(count, mean_x, mean_y,
+                     np.bincount(groups, dx * dx, n), np.bincount(groups, dx * dy, n), np.bincount(groups, dy * dy, n))
+        return self
+
+    def combine(self, count, mean_x, mean_y, sxx, sxy, syy):
+        total = self.count + count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, count / total, 0.0)
+        dx = mean_x - self.mean_x
+        dy = mean_y - self.mean_y
+        factor = self.count * weight
+        self.sxx += sxx + dx * dx * factor
+        self.sxy += sxy + dx * dy * factor
+        self.syy += syy + dy * dy * factor
+        self.mean_x += dx * weight
+        self.mean_y += dy * weight
+        self.count = total
+
+    def merge(self, other):
+        if len(other.count) > len(self.count):
+            self.grow(len(other.count))
+        padding = len(self.count) - len(other.count)
+        pad = lambda values: np.concatenate([values, np.zeros(padding)])
+        self.combine(pad(other.count), pad(other.mean_x), pad(other.mean_y), pad(other.sxx), pad(other.sxy),
+                     pad(other.syy))
+        return self
+
+    def coefficients(self):
+        # k і b для кожної групи; NaN там, де точок замало або всі x однакові
+        with np.errstate(invalid='ignore', divide='ignore'):
+            k = np.where(self.sxx > 0, self.sxy / self.sxx, np.nan)
+        return k, self.mean_y - k * self.mean_x
+
+
+class OLSAccumulator:
+    # Багатовимірна регресія через XᵀX і Xᵀy, накопичені по частинах. Дані зсуваються на середні першої частини,
+    # що зменшує втрату точності в XᵀX; вільний член додається стовпцем одиниць
+    def __init__(self, intercept=True):
+        self.intercept = intercept
+        self.count = 0
+        self.shift_x = None
+        self.shift_y = 0.0
+        self.xtx = None
+        self.xty = None
+
+    def design(self, X):
+        X = X - self.shift_x
+        return np.column_stack([np.ones(len(X)), X]) if self.intercept else X
+
+    def update(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        X = X[:, None] if X.ndim == 1 else X
+        y = np.asarray(y, dtype=np.float64).ravel()
+        keep = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        X, y = X[keep], y[keep]
+        if self.shift_x is None:
+            # Без вільного члена зсув змінив би модель, тому він лишається нульовим
+            self.shift_x = X.mean(axis=0) if self.intercept and len(X) else np.zeros(X.shape[1])
+            self.shift_y = y.mean() if self.intercept and len(y) else 0.0
+            size = X.shape[1] + self.intercept
+            self.xtx = np.zeros((size, size))
+            self.xty = np.zeros(size)
+        design = self.design(X)
+        self.xtx += design.T @ design
+        self.xty += design.T @ (y - self.shift_y)
+        self.count += len(y)
+        return self
+
+    def merge(self, other):
+        if other.shift_x is None:
+            return self
+        if self.shift_x is None:
+            self.shift_x, self.shift_y = other.shift_x, other.shift_y
+            self.xtx, self.xty, self.count = other.xtx.copy(), other.xty.copy(), other.count
+            return self
+        xtx, xty = other.xtx, other.xty
+        if self.intercept:
+            # Переведення сум іншого акумулятора до нашого зсуву: A' = A·T, y' = y + e
+            transform = np.eye(len(xty))
+            transform[0, 1:] = other.shift_x - self.shift_x
+            xty = transform.T @ (xty + (other.shift_y - self.shift_y) * xtx[:, 0])
+            xtx = transform.T @ xtx @ transform
+        self.xtx += xtx
+        self.xty += xty
+        self.count += other.count
+        return self
+
+    def coefficients(self):
+        # Повертає (вільний член, вектор коефіцієнтів) у вихідних, не зсунутих координатах
+        beta = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        if not self.intercept:
+            return 0.0, beta
+        slopes = beta[1:]
+        return beta[0] + self.shift_y - self.shift_x @ slopes, slopes